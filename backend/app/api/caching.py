@@ -0,0 +1,32 @@
+import hashlib
+import time
+from fastapi import Request, Response
+from app.core.config import settings
+
+
+def make_etag(version: int, request: Request, user_id: int, clock: bool = False) -> str:
+    """
+    Weak ETag from the user's data version, the user id and the exact path
+    and query. The id keeps two accounts on one browser from sharing a tag.
+    clock=True also folds in the current CLOCK_ETAG_SECONDS window for
+    responses that depend on the time (forgotten cutoff, decay), so a 304
+    is never more than one window out of date.
+    """
+    scope = f"{user_id}:{request.url.path}?{request.url.query}"
+    if clock:
+        scope += f"@{int(time.time() // settings.CLOCK_ETAG_SECONDS)}"
+    digest = hashlib.sha1(scope.encode("utf-8")).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Returns a 304 when the client already holds `etag`. Otherwise tags the
+    response and returns None so the handler runs its queries.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
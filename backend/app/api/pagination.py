@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.schemas.save_schema import SaveListItem
+from app.api.projections import to_items
+
+MAX_PAGE_SIZE = 500
+STREAM_CHUNK_ROWS = 500
+
+
+def encode_cursor(value, last_id: int) -> str:
+    if isinstance(value, datetime):
+        payload = {"t": "dt", "v": value.isoformat(), "id": last_id}
+    else:
+        payload = {"t": "num", "v": value, "id": last_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value = datetime.fromisoformat(payload["v"]) if payload["t"] == "dt" else payload["v"]
+        return value, int(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    response: Response,
+    sort_column,
+    id_column,
+    limit: int | None,
+    cursor: str | None,
+    format: str = "json",
+):
+    """
+    Keyset pagination over (sort_column DESC, id DESC). The query must already
+    be ordered that way. The next page's cursor goes out in X-Next-Cursor, so
+    the body stays a plain list.
+    format="ndjson" streams rows straight off a server-side cursor instead.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = query.where(tuple_(sort_column, id_column) < tuple_(value, last_id))
+
+    if format == "ndjson":
+        if limit:
+            query = query.limit(limit)
+        return StreamingResponse(stream_ndjson(query), media_type="application/x-ndjson")
+
+    query = query.add_columns(sort_column.label("_cursor"))
+    if limit:
+        query = query.limit(limit + 1)
+    items = to_items((await db.execute(query)).all())
+
+    if limit and len(items) > limit:
+        items = items[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1]["_cursor"], items[-1]["id"])
+    for item in items:
+        del item["_cursor"]
+    return items
+
+
+async def stream_ndjson(query):
+    # Own session: the request's get_db session is closed before the body is streamed
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=STREAM_CHUNK_ROWS))
+        async for row in result:
+            item = SaveListItem.model_validate(dict(row._mapping))
+            yield item.model_dump_json(exclude_unset=True) + "\n"
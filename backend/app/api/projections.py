@@ -0,0 +1,45 @@
+from fastapi import HTTPException
+from sqlalchemy import func
+from app.models.save import Save
+from app.schemas.save_schema import SaveListItem
+
+# Long text columns are cut in SQL so the full value never leaves Postgres
+PREVIEW_CHARS = 280
+PREVIEW_FIELDS = {"selected_text", "screenshot_text"}
+LIST_FIELDS = list(SaveListItem.model_fields)
+
+
+def parse_fields(fields: str | None) -> list[str]:
+    """?fields=title,intent → ["id", "title", "intent"]; all list fields when omitted."""
+    if not fields:
+        return LIST_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(requested) - set(LIST_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return ["id"] + [f for f in requested if f != "id"]
+
+
+def list_columns(fields: list[str], overrides: dict | None = None) -> list:
+    """Column expressions for `fields`; `overrides` swaps in computed values by name."""
+    overrides = overrides or {}
+    columns = []
+    for f in fields:
+        if f in overrides:
+            columns.append(overrides[f].label(f))
+        elif f in PREVIEW_FIELDS:
+            columns.append(func.left(getattr(Save, f), PREVIEW_CHARS).label(f))
+        else:
+            columns.append(getattr(Save, f))
+    return columns
+
+
+def list_columns_sql(fields: list[str]) -> str:
+    return ", ".join(
+        f"left({f}, {PREVIEW_CHARS}) AS {f}" if f in PREVIEW_FIELDS else f
+        for f in fields
+    )
+
+
+def to_items(rows) -> list[dict]:
+    return [dict(row._mapping) if hasattr(row, "_mapping") else dict(row) for row in rows]
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.core.auth import hash_password, verify_password, create_access_token
+from app.core.auth import hash_password_async, verify_password_async, needs_rehash, create_access_token, Principal
 from app.models.user import User
 from app.schemas.user_schema import UserRegister, UserLogin, TokenResponse, UserResponse
 
@@ -19,13 +19,13 @@ async def register(payload: UserRegister, db: AsyncSession = Depends(get_db)):
     user = User(
         email=payload.email,
         name=payload.name,
-        hashed_password=hash_password(payload.password)
+        hashed_password=await hash_password_async(payload.password)
     )
     db.add(user)
     await db.commit()
     await db.refresh(user)
 
-    token = create_access_token(user.id)
+    token = create_access_token(user.id, Principal.from_user(user).claims())
     return TokenResponse(
         access_token=token,
         user=UserResponse.model_validate(user)
@@ -37,10 +37,14 @@ async def login(payload: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == payload.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user or not await verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token(user.id)
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(payload.password)
+        await db.commit()
+
+    token = create_access_token(user.id, Principal.from_user(user).claims())
     return TokenResponse(
         access_token=token,
         user=UserResponse.model_validate(user)
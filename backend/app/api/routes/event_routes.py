@@ -0,0 +1,49 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.core.auth import create_stream_token, get_current_user, get_stream_user
+from app.core.config import settings
+from app.models.user import User
+from app.services.events import broker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+HEARTBEAT_SECONDS = 15
+
+
+@router.post("/token")
+async def stream_token(current_user: User = Depends(get_current_user)):
+    """
+    Short-lived token for EventSource, which can't send an Authorization
+    header: open /events/?token=<token> before it expires, and fetch a new
+    one before reconnecting.
+    """
+    return {"token": create_stream_token(current_user.id), "expires_in": settings.STREAM_TOKEN_EXPIRE_SECONDS}
+
+
+@router.get("/")
+async def stream_events(current_user: User = Depends(get_stream_user)):
+    """
+    Server-sent events for the current user's library:
+    save.created, save.enriched, save.updated, save.deleted and resync.
+    Authenticate with the Authorization header, or ?token= from POST /events/token.
+    """
+    return StreamingResponse(
+        _event_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _event_stream(user_id: int):
+    async with broker.subscribe(user_id) as queue:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            event.pop("user_id", None)
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.save import Save
 from app.models.user import User
+from app.services.user_stats import get_stats
+from app.api.caching import make_etag, not_modified
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/insights", tags=["insights"])
@@ -12,35 +14,33 @@ router = APIRouter(prefix="/insights", tags=["insights"])
 
 @router.get("/")
 async def get_insights(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     uid = current_user.id
 
-    total = (await db.execute(select(func.count(Save.id)).where(Save.user_id == uid))).scalar()
+    stats = await get_stats(db, uid)
+    cached = not_modified(request, response, make_etag(stats.version, request, uid, clock=True))
+    if cached:
+        return cached
+    total = stats.total
 
-    intent_result = await db.execute(
-        select(Save.intent, func.count(Save.id))
-        .where(Save.user_id == uid)
-        .group_by(Save.intent)
-        .order_by(func.count(Save.id).desc())
-    )
     intent_breakdown = [
-        {"intent": row[0] or "unclassified", "count": row[1]}
-        for row in intent_result.all()
+        {"intent": intent, "count": count}
+        for intent, count in sorted(stats.intent_counts.items(), key=lambda kv: kv[1], reverse=True)
+        if count > 0
     ]
 
+    # Time-based, so it can't be a counter; a range count on the open-saves partial index
     cutoff = datetime.utcnow() - timedelta(days=14)
     forgotten_count = (await db.execute(
         select(func.count(Save.id))
         .where(Save.user_id == uid, Save.action_taken == False, Save.created_at < cutoff)
     )).scalar()
 
-    acted_count = (await db.execute(
-        select(func.count(Save.id)).where(Save.user_id == uid, Save.action_taken == True)
-    )).scalar()
-
-    action_rate = round((acted_count / total * 100), 1) if total > 0 else 0
+    action_rate = round((stats.acted / total * 100), 1) if total > 0 else 0
 
     return {
         "total_saves": total,
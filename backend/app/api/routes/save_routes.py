@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional
+from sqlalchemy import select, tuple_
+from typing import Literal, Optional
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.save import Save
 from app.models.user import User
-from app.schemas.save_schema import SaveCreate, SaveResponse, SaveUpdate
-from app.services.ai_service import generate_summary
-from app.services.intent_service import classify_intent
-from app.services.embedding_service import generate_embedding
-from app.services.screenshot_service import extract_text_from_screenshot
-from app.services.decay_engine import calculate_decay
+from app.models.save_tombstone import SaveTombstone
+from app.schemas.save_schema import SaveCreate, SaveResponse, SaveListItem, SaveChanges, SaveUpdate
+from app.api.projections import parse_fields, list_columns, to_items
+from app.api.pagination import paginate, MAX_PAGE_SIZE
+from app.api.caching import make_etag, not_modified
+from app.services.enrichment_queue import enqueue_enrichment
+from app.services.enrichment_service import enrich_save
+from app.services.screenshot_service import (
+    extract_text_from_screenshot, preprocess_upload, ScreenshotRejected, ScreenshotTooLarge, PLACEHOLDER_URL
+)
+from app.services.screenshot_dedup import find_duplicate, copy_enrichment
+from app.services.user_stats import get_stats, record_created, record_updated, record_deleted
+from app.services.events import publish
+from app.services.decay_engine import calculate_decay, decay_sql
 
 router = APIRouter(prefix="/saves", tags=["saves"])
 
@@ -19,110 +28,206 @@ router = APIRouter(prefix="/saves", tags=["saves"])
 @router.post("/", response_model=SaveResponse)
 async def create_save(
     payload: SaveCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    raw_text = " ".join(filter(None, [payload.title, payload.selected_text]))
-    summary = await generate_summary(raw_text)
-    intent_result = await classify_intent(
-        title=payload.title or "",
-        url=payload.url or "",
-        content=payload.selected_text or payload.title or ""
-    )
-    embedding = await generate_embedding(raw_text or summary)
-
     new_save = Save(
         user_id=current_user.id,
         url=payload.url,
         title=payload.title,
         selected_text=payload.selected_text,
-        summary=summary,
-        intent=intent_result.get("intent"),
-        intent_confidence=intent_result.get("confidence"),
-        suggested_action=intent_result.get("suggested_action"),
-        embedding=embedding,
         action_taken=False,
         engagement_score=0.0,
         decay_score=0.0,
     )
-    db.add(new_save)
-    await db.flush()
-    new_save.decay_score = calculate_decay(new_save.created_at, new_save.engagement_score)
-    await db.commit()
-    await db.refresh(new_save)
-    return new_save
+    return await _store_save(new_save, response, db)
 
 
 @router.post("/screenshot", response_model=SaveResponse)
 async def save_screenshot(
+    response: Response,
     file: UploadFile = File(...),
-    url: str = Form(default="screenshot://local"),
+    url: str = Form(default=PLACEHOLDER_URL),
     title: str = Form(default="Screenshot"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    image_bytes = await file.read()
-    screenshot_text = await extract_text_from_screenshot(image_bytes)
-    raw_text = screenshot_text or title
-    summary = await generate_summary(raw_text)
-    intent_result = await classify_intent(
-        title=title or "Screenshot",
-        url=url or "",
-        content=screenshot_text or title or ""
-    )
-    embedding = await generate_embedding(raw_text)
+    try:
+        screenshot = await preprocess_upload(file.file, file.size)
+    except ScreenshotTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ScreenshotRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     new_save = Save(
         user_id=current_user.id,
         url=url,
         title=title,
-        screenshot_text=screenshot_text,
-        summary=summary,
-        intent=intent_result.get("intent"),
-        intent_confidence=intent_result.get("confidence"),
-        suggested_action=intent_result.get("suggested_action"),
-        embedding=embedding,
+        screenshot_hash=screenshot.phash,
+        screenshot_digest=screenshot.digest,
         action_taken=False,
         engagement_score=0.0,
         decay_score=0.0,
     )
+
+    duplicate = await find_duplicate(db, current_user.id, screenshot, url)
+    if duplicate:
+        copy_enrichment(duplicate, new_save)
+        return await _store_save(new_save, response, db, enriched=True)
+
+    if settings.ENRICHMENT_MODE != "queue":
+        new_save.screenshot_text = await extract_text_from_screenshot(screenshot.data, screenshot.mime_type)
+    return await _store_save(new_save, response, db, image_data=screenshot.data, image_mime=screenshot.mime_type)
+
+
+async def _store_save(
+    new_save: Save,
+    response: Response,
+    db: AsyncSession,
+    image_data: bytes | None = None,
+    image_mime: str | None = None,
+    enriched: bool = False,
+):
+    """Insert a Save, enriching it inline or queueing it for app.worker (202)."""
+    queued = settings.ENRICHMENT_MODE == "queue" and not enriched
+    if queued:
+        new_save.enrichment_status = "pending"
+    elif not enriched:
+        await enrich_save(new_save)
+
+    new_save.change_version = await record_created(db, new_save)
     db.add(new_save)
     await db.flush()
     new_save.decay_score = calculate_decay(new_save.created_at, new_save.engagement_score)
+    if queued:
+        enqueue_enrichment(db, new_save, image_data=image_data, image_mime=image_mime)
+        response.status_code = status.HTTP_202_ACCEPTED
+    await publish(db, new_save.user_id, "save.created", new_save.id,
+                  version=new_save.change_version, enrichment_status=new_save.enrichment_status)
     await db.commit()
     await db.refresh(new_save)
     return new_save
 
 
-@router.get("/", response_model=list[SaveResponse])
+@router.get("/", response_model=list[SaveListItem], response_model_exclude_unset=True)
 async def get_saves(
+    request: Request,
+    response: Response,
     intent: str = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = select(Save).where(Save.user_id == current_user.id).order_by(Save.created_at.desc())
+    stats = await get_stats(db, current_user.id)
+    cached = not_modified(request, response, make_etag(stats.version, request, current_user.id))
+    if cached:
+        return cached
+
+    columns = list_columns(parse_fields(fields))
+    query = (
+        select(*columns)
+        .where(Save.user_id == current_user.id)
+        .order_by(Save.created_at.desc(), Save.id.desc())
+    )
     if intent:
         query = query.where(Save.intent == intent)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, response, Save.created_at, Save.id, limit, cursor, format)
 
 
-@router.get("/forgotten", response_model=list[SaveResponse])
+@router.get("/forgotten", response_model=list[SaveListItem], response_model_exclude_unset=True)
 async def get_forgotten_saves(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    stats = await get_stats(db, current_user.id)
+    cached = not_modified(request, response, make_etag(stats.version, request, current_user.id, clock=True))
+    if cached:
+        return cached
+
     from datetime import datetime, timedelta
     cutoff = datetime.utcnow() - timedelta(days=14)
+    # Ranked on decay computed now, not the stored decay_score snapshot
+    decay = decay_sql(Save.created_at, Save.engagement_score)
     query = (
-        select(Save)
+        select(*list_columns(parse_fields(fields), overrides={"decay_score": decay}))
         .where(Save.user_id == current_user.id)
         .where(Save.action_taken == False)
         .where(Save.created_at < cutoff)
-        .order_by(Save.decay_score.desc())
+        .order_by(decay.desc(), Save.id.desc())
     )
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, response, decay, Save.id, limit, cursor, format)
+
+
+@router.get("/changes", response_model=SaveChanges, response_model_exclude_unset=True)
+async def get_changes(
+    since: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(default=MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Saves created or modified after `since`, plus ids deleted after it.
+    Omit `since` for a full sync. Keep polling while has_more is true.
+    """
+    # Cursor is "<version>", or "<version>.<id>" mid-page (pre-sync rows all share version 0)
+    since_version, since_id = None, None
+    try:
+        if since:
+            version_part, _, id_part = since.partition(".")
+            since_version = int(version_part)
+            since_id = int(id_part) if id_part else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Every version up to this one is committed: writes serialize on the user_stats row
+    stats = await get_stats(db, current_user.id)
+    upper = stats.version
+
+    query = (
+        select(*list_columns(parse_fields(fields)), Save.change_version.label("_version"))
+        .where(Save.user_id == current_user.id, Save.change_version <= upper)
+        .order_by(Save.change_version, Save.id)
+        .limit(limit + 1)
+    )
+    if since_id is not None:
+        query = query.where(tuple_(Save.change_version, Save.id) > tuple_(since_version, since_id))
+    elif since_version is not None:
+        query = query.where(Save.change_version > since_version)
+    changes = to_items((await db.execute(query)).all())
+
+    cursor = str(upper)
+    has_more = len(changes) > limit
+    if has_more:
+        changes = changes[:limit]
+        upper = changes[-1]["_version"]
+        cursor = f"{upper}.{changes[-1]['id']}"
+    for item in changes:
+        del item["_version"]
+
+    deleted = []
+    if since_version is not None:
+        deleted = (await db.execute(
+            select(SaveTombstone.save_id)
+            .where(
+                SaveTombstone.user_id == current_user.id,
+                SaveTombstone.version > since_version,
+                SaveTombstone.version <= upper,
+            )
+            .order_by(SaveTombstone.version)
+        )).scalars().all()
+
+    return {"changes": changes, "deleted": deleted, "cursor": cursor, "has_more": has_more}
 
 
 @router.get("/{save_id}", response_model=SaveResponse)
@@ -148,16 +253,21 @@ async def update_save(
     current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
-        select(Save).where(Save.id == save_id, Save.user_id == current_user.id)
+        select(Save).where(Save.id == save_id, Save.user_id == current_user.id).with_for_update()
     )
     save = result.scalar_one_or_none()
     if not save:
         raise HTTPException(status_code=404, detail="Save not found")
+    save.change_version = await record_updated(
+        db, current_user.id, save.action_taken,
+        payload.action_taken if payload.action_taken is not None else save.action_taken
+    )
     if payload.action_taken is not None:
         save.action_taken = payload.action_taken
     if payload.engagement_score is not None:
         save.engagement_score = payload.engagement_score
         save.decay_score = calculate_decay(save.created_at, save.engagement_score)
+    await publish(db, current_user.id, "save.updated", save.id, version=save.change_version)
     await db.commit()
     await db.refresh(save)
     return save
@@ -170,11 +280,14 @@ async def delete_save(
     current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
-        select(Save).where(Save.id == save_id, Save.user_id == current_user.id)
+        select(Save).where(Save.id == save_id, Save.user_id == current_user.id).with_for_update()
     )
     save = result.scalar_one_or_none()
     if not save:
         raise HTTPException(status_code=404, detail="Save not found")
+    version = await record_deleted(db, save)
+    db.add(SaveTombstone(user_id=current_user.id, save_id=save.id, version=version))
+    await publish(db, current_user.id, "save.deleted", save.id, version=version)
     await db.delete(save)
     await db.commit()
     return {"deleted": True, "id": save_id}
@@ -190,7 +303,7 @@ async def delete_save(
 # from app.services.ai_service import generate_summary
 # from app.services.intent_service import classify_intent
 # from app.services.embedding_service import generate_embedding
-# from app.services.decay_engine import calculate_decay
+# from app.services.decay_engine import calculate_decay, decay_sql
 
 # router = APIRouter(prefix="/saves", tags=["saves"])
 
@@ -1,48 +1,57 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select
+from typing import Optional
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.save import Save
 from app.models.user import User
-from app.schemas.save_schema import SaveResponse
-from app.services.embedding_service import generate_embedding
+from app.schemas.save_schema import SaveListItem
+from app.api.projections import parse_fields, list_columns, list_columns_sql, to_items
+from app.services.embedding_service import embed_query
+from app.services.vector_search import vector_search
+from app.services.hybrid_search import hybrid_search
 
 router = APIRouter(prefix="/search", tags=["search"])
 
 
-@router.get("/", response_model=list[SaveResponse])
+@router.get("/", response_model=list[SaveListItem], response_model_exclude_unset=True)
 async def semantic_search(
     q: str,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if not q or len(q.strip()) < 2:
         return []
 
-    query_embedding = await generate_embedding(q)
+    field_names = parse_fields(fields)
+    columns = list_columns_sql(field_names)
+
+    if settings.SEARCH_HYBRID:
+        rows, semantic_ok = await hybrid_search(current_user.id, q, columns=columns)
+        if rows or semantic_ok:
+            return to_items(rows)
+        return await _ilike_search(db, current_user.id, q, field_names)
+
+    query_embedding = await embed_query(q)
 
     if not query_embedding:
-        result = await db.execute(
-            select(Save).where(
-                Save.user_id == current_user.id,
-                Save.title.ilike(f"%{q}%") | Save.summary.ilike(f"%{q}%")
-            ).limit(10)
-        )
-        return result.scalars().all()
-
-    embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
+        return await _ilike_search(db, current_user.id, q, field_names)
+
+    rows = await vector_search(db, current_user.id, query_embedding, columns=columns)
+    return to_items(rows)
+
+
+async def _ilike_search(db: AsyncSession, user_id: int, q: str, field_names: list[str]):
     result = await db.execute(
-        text("""
-            SELECT * FROM saves
-            WHERE user_id = :user_id
-            ORDER BY embedding <=> CAST(:embedding AS vector)
-            LIMIT 10
-        """),
-        {"embedding": embedding_str, "user_id": current_user.id}
+        select(*list_columns(field_names)).where(
+            Save.user_id == user_id,
+            Save.title.ilike(f"%{q}%") | Save.summary.ilike(f"%{q}%")
+        ).limit(10)
     )
-    rows = result.mappings().all()
-    return [Save(**dict(row)) for row in rows]
+    return to_items(result.all())
 
 # from fastapi import APIRouter, Depends
 # from sqlalchemy.ext.asyncio import AsyncSession
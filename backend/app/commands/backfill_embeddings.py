@@ -0,0 +1,59 @@
+"""
+Fill saves.embedding_small for rows saved before the HNSW column existed.
+
+    python -m app.commands.backfill_embeddings [--batch 2000]
+
+Truncation and normalization run inside Postgres (pgvector >= 0.7), so the
+3072-float vectors never leave the database. Safe to stop and re-run.
+Switch SEARCH_EMBEDDING_COLUMN=embedding_small once it reports 0 remaining.
+"""
+import argparse
+import asyncio
+import time
+import sqlalchemy
+from app.core.config import settings
+from app.core.database import engine
+from app.core.schema import apply_schema_patches
+
+
+async def backfill(batch_size: int):
+    dim = settings.EMBEDDING_INDEX_DIM
+    async with engine.begin() as conn:
+        await apply_schema_patches(conn)
+
+    total = 0
+    started = time.perf_counter()
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                sqlalchemy.text(f"""
+                    UPDATE saves
+                    SET embedding_small = l2_normalize(subvector(embedding, 1, {dim}))::vector({dim})
+                    WHERE id IN (
+                        SELECT id FROM saves
+                        WHERE embedding_small IS NULL AND embedding IS NOT NULL
+                        ORDER BY id
+                        LIMIT :batch
+                        FOR UPDATE SKIP LOCKED
+                    )
+                """),
+                {"batch": batch_size}
+            )
+        if result.rowcount == 0:
+            break
+        total += result.rowcount
+        print(f"[backfill_embeddings] {total} rows ({total / (time.perf_counter() - started):.0f} rows/s)")
+
+    async with engine.connect() as conn:
+        remaining = (await conn.execute(sqlalchemy.text(
+            "SELECT count(*) FROM saves WHERE embedding_small IS NULL AND embedding IS NOT NULL"
+        ))).scalar()
+    print(f"✅ backfilled {total} saves, {remaining} remaining")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch))
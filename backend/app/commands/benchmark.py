@@ -0,0 +1,284 @@
+"""
+End-to-end load benchmark for the API, run in-process against a local
+pgvector database with the offline AI provider standing in for Gemini.
+
+    python -m app.commands.benchmark [--scales 1000 10000 100000] [--users 2]
+        [--concurrency 16] [--requests 400] [--llm-latency-ms 300]
+        [--embed-latency-ms 50] [--out bench.json]
+
+Seeding: for each scale, synthetic users (bench-<scale>-<n>@bench.local)
+are given that many saves each. Users that already have enough saves
+are reused. Embeddings are random vectors generated inside Postgres.
+created_at is spread over 90 days, so /saves/forgotten has rows to rank.
+
+Scenarios: each scale runs POST /saves/, GET /saves/, GET
+/saves/forgotten, GET /search/ and GET /insights/ one at a time, then a
+mixed run of all five. Requests go through httpx's ASGI transport with
+--concurrency workers.
+
+Output: every result has p50/p95/p99 latency, requests/sec, errors and
+the number of DB statements executed. Statements are counted by a
+cursor-execute hook and attributed to the endpoint that issued them.
+The run is printed as a table and then as JSON (also written to --out),
+with the git commit, so runs can be compared across commits.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import subprocess
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+import httpx
+import sqlalchemy
+from sqlalchemy import event, select
+from app.core.auth import Principal, create_access_token, hash_password
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.main import app, on_startup
+from app.models.user import User
+from app.services.gemini_client import gemini
+from app.services.intent_service import VALID_INTENTS
+from app.services.user_stats import reconcile
+
+SEED_CHUNK = 5000
+
+TOPICS = [
+    "python asyncio", "postgres indexing", "rust ownership", "product pricing",
+    "remote backend jobs", "seed funding", "standing desk", "marathon training",
+    "sourdough baking", "vector databases", "system design", "sleep habits",
+]
+
+SEED_SQL = sqlalchemy.text("""
+    INSERT INTO saves (user_id, url, title, selected_text, summary, intent, intent_confidence,
+                       intent_source, suggested_action, enrichment_status, action_taken,
+                       engagement_score, decay_score, embedding, embedding_small,
+                       created_at, updated_at)
+    SELECT :user_id,
+           'https://bench.local/' || CAST(:user_id AS integer) || '/' || g,
+           t.topic || ' note ' || g,
+           'Synthetic save ' || g || ' about ' || t.topic || '.',
+           'A saved page about ' || t.topic || '.',
+           t.intent, 0.9, 'llm', 'Review this save manually.', 'done',
+           g % 7 = 0, (g % 5)::float, 0.0,
+           e.v, l2_normalize(subvector(e.v, 1, :small_dim)),
+           now() - (g % 90) * interval '1 day' - (g % 1440) * interval '1 minute',
+           now()
+    FROM generate_series(:start, :stop) AS g
+    CROSS JOIN LATERAL (
+        SELECT (CAST(:topics AS text[]))[1 + g % cardinality(CAST(:topics AS text[]))] AS topic,
+               (CAST(:intents AS text[]))[1 + g % cardinality(CAST(:intents AS text[]))] AS intent
+    ) AS t
+    CROSS JOIN LATERAL (
+        SELECT ARRAY(SELECT random() - 0.5 FROM generate_series(1, :dim) WHERE g > 0)::vector AS v
+    ) AS e
+""")
+
+# ── DB statement counting ─────────────────────────────────────
+# SQLAlchemy's async greenlets inherit the caller's context, so the
+# endpoint set by the request worker is visible in the cursor hook.
+
+current_endpoint: ContextVar[str | None] = ContextVar("current_endpoint", default=None)
+query_counts: Counter = Counter()
+
+
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    query_counts[current_endpoint.get()] += 1
+
+
+# ── Seeding ───────────────────────────────────────────────────
+
+async def seed_user(email: str, saves: int) -> User:
+    """Create the user if needed and top it up to `saves` rows."""
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+        if user is None:
+            user = User(email=email, name="Benchmark", hashed_password=hash_password("bench-password"))
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
+
+        existing = (await db.execute(
+            sqlalchemy.text("SELECT count(*) FROM saves WHERE user_id = :uid"), {"uid": user.id}
+        )).scalar_one()
+
+        for start in range(existing + 1, saves + 1, SEED_CHUNK):
+            stop = min(start + SEED_CHUNK - 1, saves)
+            await db.execute(SEED_SQL, {
+                "user_id": user.id, "start": start, "stop": stop,
+                "topics": TOPICS, "intents": VALID_INTENTS,
+                "dim": settings.OFFLINE_EMBEDDING_DIM, "small_dim": settings.EMBEDDING_INDEX_DIM,
+            })
+            await db.commit()
+            print(f"  {email}: {stop}/{saves} saves")
+
+        await reconcile(db, user.id)
+        await db.commit()
+        return user
+
+
+# ── Scenarios ─────────────────────────────────────────────────
+
+def build_endpoints() -> dict:
+    counter = itertools.count()
+
+    def new_save(client, headers, i):
+        n = next(counter)
+        return client.post("/saves/", headers=headers, json={
+            "url": f"https://bench.local/new/{time.time_ns()}-{n}",
+            "title": f"{TOPICS[n % len(TOPICS)]} article {n}",
+            "selected_text": f"Fresh benchmark save {n} about {TOPICS[n % len(TOPICS)]}. "
+                             f"It needs a summary, an intent and an embedding.",
+        })
+
+    return {
+        "POST /saves/": new_save,
+        "GET /saves/": lambda client, headers, i: client.get("/saves/", headers=headers, params={"limit": 50}),
+        "GET /saves/forgotten": lambda client, headers, i: client.get(
+            "/saves/forgotten", headers=headers, params={"limit": 50}),
+        "GET /search/": lambda client, headers, i: client.get(
+            "/search/", headers=headers, params={"q": TOPICS[i % len(TOPICS)]}),
+        "GET /insights/": lambda client, headers, i: client.get("/insights/", headers=headers),
+    }
+
+
+def summarize(name: str, latencies: list[float], errors: int, elapsed: float, queries: int) -> dict:
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "endpoint": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(cuts[49], 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+        "db_queries": queries,
+        "db_queries_per_request": round(queries / len(latencies), 2),
+    }
+
+
+async def drive(client, endpoints: dict, tokens: list[str], n_requests: int, concurrency: int) -> list[dict]:
+    """Send n_requests, spread round-robin over `endpoints`, from `concurrency` workers."""
+    names = list(endpoints)
+    latencies = defaultdict(list)
+    errors = Counter()
+    counter = itertools.count()
+    query_counts.clear()
+
+    async def worker():
+        while (i := next(counter)) < n_requests:
+            name = names[i % len(names)]
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            reset = current_endpoint.set(name)
+            started = time.perf_counter()
+            try:
+                response = await endpoints[name](client, headers, i)
+                if response.status_code >= 400:
+                    errors[name] += 1
+            except Exception as e:
+                errors[name] += 1
+                print(f"[benchmark] {name}: {e}")
+            finally:
+                current_endpoint.reset(reset)
+            latencies[name].append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = [summarize(name, latencies[name], errors[name], elapsed, query_counts[name]) for name in names]
+    if len(names) > 1:
+        every = [ms for name in names for ms in latencies[name]]
+        results.append(summarize("mixed", every, sum(errors.values()), elapsed, sum(query_counts[n] for n in names)))
+    return results
+
+
+def print_table(scale: int, results: list[dict]) -> None:
+    print(f"\n{scale} saves/user")
+    print(f"{'scenario':<9} {'endpoint':<22} {'req':>6} {'err':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'q/req':>7}")
+    for r in results:
+        print(f"{r['scenario']:<9} {r['endpoint']:<22} {r['requests']:>6} {r['errors']:>5} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['db_queries_per_request']:>7.2f}")
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args):
+    # The registry resolves its provider on first use, so switching here
+    # (before startup warms it) keeps every Gemini call local.
+    settings.AI_PROVIDER = "offline"
+    gemini.provider = "offline"
+    settings.OFFLINE_LLM_LATENCY_MS = args.llm_latency_ms
+    settings.OFFLINE_EMBED_LATENCY_MS = args.embed_latency_ms
+
+    await on_startup()
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+    endpoints = build_endpoints()
+    report = {
+        "commit": git_commit(),
+        "provider": "offline",
+        "llm_latency_ms": args.llm_latency_ms,
+        "embed_latency_ms": args.embed_latency_ms,
+        "enrichment_mode": settings.ENRICHMENT_MODE,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scales": [],
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scale in args.scales:
+            print(f"Seeding {args.users} user(s) with {scale} saves each...")
+            seed_started = time.perf_counter()
+            tokens = []
+            for n in range(args.users):
+                user = await seed_user(f"bench-{scale}-{n}@bench.local", scale)
+                tokens.append(create_access_token(user.id, Principal.from_user(user).claims()))
+            seed_seconds = round(time.perf_counter() - seed_started, 2)
+
+            # One untimed pass so connections, caches and models are warm
+            await drive(client, endpoints, tokens, len(endpoints), 1)
+
+            results = []
+            for name, make in endpoints.items():
+                results += await drive(client, {name: make}, tokens, args.requests, args.concurrency)
+            mixed = await drive(client, endpoints, tokens, args.requests * len(endpoints), args.concurrency)
+            for r in results:
+                r["scenario"] = "isolated"
+            for r in mixed:
+                r["scenario"] = "mixed"
+            results += mixed
+
+            print_table(scale, results)
+            report["scales"].append({
+                "saves_per_user": scale, "users": args.users, "seed_seconds": seed_seconds, "results": results,
+            })
+
+    event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+    print(json.dumps(report))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Benchmark written to {args.out}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400, help="requests per endpoint per scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=50.0)
+    parser.add_argument("--out", default=None)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Build the search indexes that are too slow to create on startup, without
+blocking writes.
+
+    python -m app.commands.build_search_indexes [--quantized]
+
+Indexes are built with CREATE INDEX CONCURRENTLY, so saves stay writable
+while a build runs, which can take a while on a large table. An index left
+invalid by an interrupted build is dropped and rebuilt. Safe to re-run.
+
+- ix_saves_fulltext: GIN over SEARCH_TSV_SQL for full-text and hybrid
+  search. New databases get it from create_all.
+- ix_saves_quantized_hnsw: HNSW over binary_quantize(embedding) for
+  SEARCH_QUANTIZED. Only built with --quantized or SEARCH_QUANTIZED=true,
+  and dropped otherwise, since every write to saves pays for it.
+
+Finally the stored embedding_bits and search_tsv columns of earlier
+versions, and their indexes, are dropped.
+"""
+import argparse
+import asyncio
+import time
+import sqlalchemy
+from app.core.config import settings
+from app.core.database import engine
+from app.models.save import EMBEDDING_BITS_SQL, SEARCH_TSV_SQL
+
+FULLTEXT_INDEX = ("ix_saves_fulltext", f"USING gin ({SEARCH_TSV_SQL})")
+QUANTIZED_INDEX = ("ix_saves_quantized_hnsw", f"USING hnsw (({EMBEDDING_BITS_SQL}) bit_hamming_ops)")
+
+LEGACY_DDL = [
+    "ALTER TABLE saves DROP COLUMN IF EXISTS embedding_bits",
+    "ALTER TABLE saves DROP COLUMN IF EXISTS search_tsv",
+]
+
+INDEX_VALID_SQL = sqlalchemy.text("""
+    SELECT i.indisvalid FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :name
+""")
+
+
+async def build_index(conn, name: str, definition: str) -> None:
+    valid = (await conn.execute(INDEX_VALID_SQL, {"name": name})).scalar()
+    if valid:
+        print(f"  {name}: already built")
+        return
+    if valid is False:
+        print(f"  {name}: invalid after an interrupted build, rebuilding")
+        await conn.execute(sqlalchemy.text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    started = time.perf_counter()
+    await conn.execute(sqlalchemy.text(f"CREATE INDEX CONCURRENTLY {name} ON saves {definition}"))
+    print(f"  {name}: built in {time.perf_counter() - started:.1f}s")
+
+
+async def run(quantized: bool):
+    async with engine.connect() as conn:
+        # CONCURRENTLY can't run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await build_index(conn, *FULLTEXT_INDEX)
+        name, definition = QUANTIZED_INDEX
+        if quantized:
+            await build_index(conn, name, definition)
+        else:
+            await conn.execute(sqlalchemy.text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            print(f"  {name}: not needed without SEARCH_QUANTIZED, dropped if present")
+
+        # Dropping a column only needs a brief exclusive lock; don't queue
+        # behind long transactions while holding up everyone else
+        await conn.execute(sqlalchemy.text("SET lock_timeout = '5s'"))
+        for statement in LEGACY_DDL:
+            await conn.execute(sqlalchemy.text(statement))
+    print("✅ search indexes ready")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quantized", action="store_true", default=settings.SEARCH_QUANTIZED)
+    args = parser.parse_args()
+    asyncio.run(run(args.quantized))
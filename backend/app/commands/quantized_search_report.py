@@ -0,0 +1,77 @@
+"""
+Recall-vs-latency report for the two-stage quantized search.
+
+    python -m app.commands.quantized_search_report [--queries 200] [--candidates 50 100 200 400 800]
+
+Stored save embeddings are used as queries. For each query the exact
+top-k (cosine on the full embedding) is compared with the quantized
+top-k at each candidate count. Prints recall@k and mean latency per
+setting, then the same numbers as JSON. Build ix_saves_quantized_hnsw
+with app.commands.build_search_indexes --quantized first, or the
+quantized timings are sequential scans.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import sqlalchemy
+from app.core.database import AsyncSessionLocal, engine
+from app.services.vector_search import vector_search
+
+
+async def timed_ids(db, user_id, embedding, k, quantized, candidates=None):
+    started = time.perf_counter()
+    rows = await vector_search(db, user_id, embedding, limit=k, quantized=quantized, candidates=candidates)
+    return [row["id"] for row in rows], (time.perf_counter() - started) * 1000
+
+
+async def report(n_queries: int, candidate_counts: list[int], k: int):
+    async with AsyncSessionLocal() as db:
+        sample = (await db.execute(sqlalchemy.text("""
+            SELECT user_id, embedding::text AS embedding FROM saves
+            WHERE embedding IS NOT NULL
+            ORDER BY random()
+            LIMIT :n
+        """), {"n": n_queries})).all()
+
+        if not sample:
+            print("No embedded saves to sample.")
+            return
+
+        queries = [(row.user_id, json.loads(row.embedding)) for row in sample]
+        exact = []
+        exact_ms = []
+        for user_id, embedding in queries:
+            ids, ms = await timed_ids(db, user_id, embedding, k, quantized=False)
+            exact.append(set(ids))
+            exact_ms.append(ms)
+
+        results = [{"mode": "exact", "candidates": None, "recall": 1.0, "mean_ms": round(statistics.mean(exact_ms), 2)}]
+        for candidates in candidate_counts:
+            recalls, latencies = [], []
+            for (user_id, embedding), truth in zip(queries, exact):
+                ids, ms = await timed_ids(db, user_id, embedding, k, quantized=True, candidates=candidates)
+                recalls.append(len(truth & set(ids)) / len(truth) if truth else 1.0)
+                latencies.append(ms)
+            results.append({
+                "mode": "quantized",
+                "candidates": candidates,
+                "recall": round(statistics.mean(recalls), 4),
+                "mean_ms": round(statistics.mean(latencies), 2),
+            })
+
+    print(f"{'mode':<10} {'candidates':>10} {f'recall@{k}':>10} {'mean ms':>10}")
+    for r in results:
+        print(f"{r['mode']:<10} {str(r['candidates'] or '-'):>10} {r['recall']:>10.4f} {r['mean_ms']:>10.2f}")
+    print(json.dumps({"queries": len(queries), "k": k, "results": results}))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 100, 200, 400, 800])
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(report(args.queries, args.candidates, args.k))
@@ -0,0 +1,25 @@
+"""
+Rebuild user_stats counters from the saves table and repair any drift.
+
+    python -m app.commands.reconcile_stats [--user-id 42]
+"""
+import argparse
+import asyncio
+from app.core.database import AsyncSessionLocal, engine
+from app.models import user  # noqa: F401  (registers User for Save.user)
+from app.services.user_stats import reconcile
+
+
+async def run(user_id: int | None):
+    async with AsyncSessionLocal() as db:
+        repaired = await reconcile(db, user_id)
+        await db.commit()
+    print(f"✅ user_stats reconciled — {repaired} row(s) inserted or repaired")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.user_id))
@@ -0,0 +1,109 @@
+"""
+Refresh the stored saves.decay_score for every save.
+
+    python -m app.commands.rescore_decay [--chunk 50000] [--restart]
+
+Rows are read in id order, one chunk at a time, decay is computed with
+NumPy over the whole chunk (same curves as calculate_decay) and only the
+rows whose score changed are written back, with a single
+UPDATE ... FROM unnest(...) per chunk. In the same transaction their
+owners' user_stats.version is bumped and the rows are stamped with it as
+change_version, so cached /saves ETags stop matching and /saves/changes
+sends the new scores. The last finished id is kept in a checkpoint file,
+so an interrupted run picks up where it stopped. --restart starts over
+from the first row.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import sqlalchemy
+from app.core.config import settings
+from app.core.database import engine
+from app.services.decay_engine import PY_CURVES
+
+FETCH_SQL = sqlalchemy.text("""
+    SELECT id, created_at, engagement_score, decay_score FROM saves
+    WHERE id > :last_id
+    ORDER BY id
+    LIMIT :chunk
+""")
+
+# user_stats first, then saves: the same lock order as the API's writes
+BUMP_VERSIONS_SQL = sqlalchemy.text("""
+    UPDATE user_stats SET version = version + 1, updated_at = now()
+    WHERE user_id IN (SELECT DISTINCT user_id FROM saves WHERE id = ANY(CAST(:ids AS integer[])))
+""")
+
+UPDATE_SQL = sqlalchemy.text("""
+    UPDATE saves SET decay_score = v.decay_score,
+        change_version = coalesce((SELECT version FROM user_stats s WHERE s.user_id = saves.user_id), change_version)
+    FROM (
+        SELECT unnest(CAST(:ids AS integer[])) AS id,
+               unnest(CAST(:scores AS double precision[])) AS decay_score
+    ) AS v
+    WHERE saves.id = v.id
+""")
+
+
+def compute_decay(created_at: np.ndarray, engagement: np.ndarray, now: datetime, curve: str) -> np.ndarray:
+    """Vectorized calculate_decay: curve(whole days since save) * (1 - clamped engagement)."""
+    days = (np.datetime64(now, "us") - created_at) // np.timedelta64(1, "D")
+    engagement = np.clip(np.nan_to_num(engagement, nan=0.0), 0.0, 1.0)
+    return np.round(PY_CURVES[curve](days.astype(np.float64)) * (1 - engagement), 2)
+
+
+async def rescore(chunk: int, checkpoint: Path, restart: bool):
+    last_id = 0
+    if checkpoint.exists() and not restart:
+        last_id = int(checkpoint.read_text().strip() or 0)
+        print(f"[rescore_decay] resuming after id {last_id}")
+
+    now = datetime.utcnow()
+    total = updated = 0
+    started = time.perf_counter()
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(FETCH_SQL, {"last_id": last_id, "chunk": chunk})).all()
+            if not rows:
+                break
+
+            ids = np.fromiter((r.id for r in rows), dtype=np.int64, count=len(rows))
+            created_at = np.array([r.created_at for r in rows], dtype="datetime64[us]")
+            engagement = np.fromiter(
+                (r.engagement_score if r.engagement_score is not None else 0.0 for r in rows),
+                dtype=np.float64, count=len(rows)
+            )
+            stored = np.fromiter(
+                (r.decay_score if r.decay_score is not None else np.nan for r in rows),
+                dtype=np.float64, count=len(rows)
+            )
+            scores = compute_decay(created_at, engagement, now, settings.DECAY_CURVE)
+            changed = scores != stored
+            if changed.any():
+                await conn.execute(BUMP_VERSIONS_SQL, {"ids": ids[changed].tolist()})
+                await conn.execute(UPDATE_SQL, {"ids": ids[changed].tolist(), "scores": scores[changed].tolist()})
+
+        last_id = int(ids[-1])
+        checkpoint.write_text(str(last_id))
+        total += len(rows)
+        updated += int(changed.sum())
+        print(f"[rescore_decay] {total} rows, {updated} updated, last id {last_id} "
+              f"({total / (time.perf_counter() - started):.0f} rows/s)")
+
+    elapsed = time.perf_counter() - started
+    checkpoint.unlink(missing_ok=True)
+    print(f"✅ rescored {total} saves, {updated} updated, in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:.0f} rows/s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk", type=int, default=50000)
+    parser.add_argument("--checkpoint", type=Path, default=Path(".rescore_decay.checkpoint"))
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(rescore(args.chunk, args.checkpoint, args.restart))
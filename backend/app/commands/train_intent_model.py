@@ -0,0 +1,131 @@
+"""
+Train the local intent classifier on Gemini-labelled saves and report
+how much of the LLM traffic it would take over.
+
+    python -m app.commands.train_intent_model [--sample 20000] [--holdout 0.2] [--threshold 0.85] [--dry-run]
+
+Saves whose intent came from the LLM (intent_source 'llm', or NULL for
+rows older than the column) are split into train and holdout sets. The
+model is fit on embedding_small. On the holdout set the report gives,
+for the rules, the model and the full cascade:
+
+- accuracy on every row
+- coverage: the share of rows at or above the threshold, where the
+  intent would be decided locally
+- accuracy on the covered rows
+- llm_call_reduction: covered rows that also have too little text to
+  summarize, so they would need no Gemini call at all. The other covered
+  rows still make a summary-only call, which saves intent prompt tokens
+  but not a round trip.
+
+The model stage only runs in production when the embedding is ready
+within INTENT_EMBEDDING_WAIT_MS, so treat its numbers as an upper bound.
+
+It prints a table, then the same numbers as JSON, and writes the model
+to INTENT_MODEL_PATH unless --dry-run is given.
+"""
+import argparse
+import asyncio
+import json
+import numpy as np
+import sqlalchemy
+from app.core.config import settings
+from app.core.database import engine
+from app.services.ai_service import summarizable
+from app.services.intent_classifier import IntentModel, rule_intent
+from app.services.intent_service import VALID_INTENTS
+
+SAMPLE_SQL = sqlalchemy.text("""
+    SELECT url, title, selected_text, screenshot_text, intent,
+           embedding_small::text AS embedding
+    FROM saves
+    WHERE embedding_small IS NOT NULL
+      AND intent = ANY(:intents)
+      AND (intent_source IS NULL OR intent_source = 'llm')
+    ORDER BY random()
+    LIMIT :n
+""")
+
+
+def summarize(name: str, predicted: list, confident: np.ndarray, truth: np.ndarray, needs_summary: np.ndarray) -> dict:
+    predicted = np.array(predicted, dtype=object)
+    correct = predicted == truth
+    covered = int(confident.sum())
+    return {
+        "stage": name,
+        "accuracy": round(float(correct.mean()), 4),
+        "coverage": round(covered / len(truth), 4),
+        "covered_accuracy": round(float(correct[confident].mean()), 4) if covered else None,
+        "llm_call_reduction": round(float((confident & ~needs_summary).mean()), 4),
+    }
+
+
+async def run(sample: int, holdout: float, threshold: float, epochs: int, dry_run: bool):
+    async with engine.connect() as conn:
+        rows = (await conn.execute(SAMPLE_SQL, {"intents": VALID_INTENTS, "n": sample})).all()
+    await engine.dispose()
+
+    if len(rows) < 50:
+        print(f"Only {len(rows)} LLM-labelled saves with embeddings, need at least 50.")
+        return
+
+    urls = [row.url for row in rows]
+    # Same text enrichment_text() would summarize
+    needs_summary = np.array([
+        summarizable(row.screenshot_text or " ".join(filter(None, [row.title, row.selected_text])))
+        for row in rows
+    ])
+    labels = np.array([row.intent for row in rows], dtype=object)
+    X = np.array([json.loads(row.embedding) for row in rows], dtype=np.float32)
+
+    n_test = max(1, int(len(rows) * holdout))
+    train, test = slice(n_test, None), slice(None, n_test)
+    model = IntentModel.fit(X[train], list(labels[train]), epochs=epochs)
+
+    truth = labels[test]
+    needs = needs_summary[test]
+    proba = model.predict_proba(X[test])
+    model_pred = [model.classes[i] for i in proba.argmax(axis=1)]
+    model_conf = proba.max(axis=1) >= threshold
+
+    rules = [rule_intent(url) for url in urls[test]]
+    rule_pred = [r[0] if r else None for r in rules]
+    rule_conf = np.array([bool(r) and r[1] >= threshold for r in rules])
+
+    cascade_pred = [r if c else m for r, c, m in zip(rule_pred, rule_conf, model_pred)]
+    cascade_conf = rule_conf | model_conf
+
+    results = [
+        summarize("rules", rule_pred, rule_conf, truth, needs),
+        summarize("model", model_pred, model_conf, truth, needs),
+        summarize("cascade", cascade_pred, cascade_conf, truth, needs),
+    ]
+
+    print(f"{'stage':<8} {'accuracy':>9} {'coverage':>9} {'covered acc':>12} {'no-LLM':>8}")
+    for r in results:
+        covered_acc = f"{r['covered_accuracy']:.4f}" if r["covered_accuracy"] is not None else "-"
+        print(f"{r['stage']:<8} {r['accuracy']:>9.4f} {r['coverage']:>9.4f} {covered_acc:>12} "
+              f"{r['llm_call_reduction']:>8.4f}")
+    print(json.dumps({
+        "train": len(rows) - n_test,
+        "holdout": n_test,
+        "threshold": threshold,
+        "intent_local_rate": results[-1]["coverage"],
+        "llm_call_reduction": results[-1]["llm_call_reduction"],
+        "results": results,
+    }))
+
+    if not dry_run:
+        model.save(settings.INTENT_MODEL_PATH)
+        print(f"✅ Intent model written to {settings.INTENT_MODEL_PATH} — restart the API and worker to load it")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", type=int, default=20000)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=settings.INTENT_LOCAL_THRESHOLD)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.sample, args.holdout, args.threshold, args.epochs, args.dry_run))
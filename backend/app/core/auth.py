@@ -1,19 +1,25 @@
-from datetime import datetime, timedelta
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from app.core.config import settings
 from app.core.database import get_db
 import bcrypt
 
 bearer_scheme = HTTPBearer()
+optional_bearer_scheme = HTTPBearer(auto_error=False)
 
 
 def hash_password(password: str) -> str:
     pwd_bytes = password.encode("utf-8")[:72]
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(pwd_bytes, salt).decode("utf-8")
 
 
@@ -25,76 +31,228 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
 
 
-def create_access_token(user_id: int) -> str:
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored hash ($2b$<cost>$...) was made with other rounds than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+# ── Hashing pool ──────────────────────────────────────────────
+# bcrypt releases the GIL, so a few threads keep it off the event loop.
+# Past PASSWORD_HASH_MAX_PENDING queued calls we shed load with a 503
+# rather than let a login burst queue up unbounded work.
+
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_pending = 0
+
+
+async def _run_hashing(fn, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_hashing(verify_password, plain, hashed)
+
+
+def create_access_token(user_id: int, claims: dict | None = None) -> str:
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return jwt.encode(
-        {"sub": str(user_id), "exp": expire},
+        {"sub": str(user_id), "exp": expire, "iat": int(now.timestamp()), **(claims or {})},
         settings.SECRET_KEY,
         algorithm="HS256"
     )
 
 
+STREAM_SCOPE = "events"
+
+
+def create_stream_token(user_id: int) -> str:
+    """
+    Short-lived token for GET /events/?token=, where it ends up in access
+    logs and browser history. Only valid there, and only for connecting.
+    """
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    return jwt.encode(
+        {"sub": str(user_id), "exp": expire, "iat": int(now.timestamp()), "scope": STREAM_SCOPE},
+        settings.SECRET_KEY,
+        algorithm="HS256"
+    )
+
+
+# ── Authenticated principal ───────────────────────────────────
+
+@dataclass(frozen=True)
+class Principal:
+    """What routes need to know about the caller, without an ORM User."""
+    id: int
+    email: str
+    name: str | None
+    created_at: datetime
+    tokens_valid_after: datetime | None = None
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, email=user.email, name=user.name, created_at=user.created_at,
+                   tokens_valid_after=user.tokens_valid_after)
+
+    def claims(self) -> dict:
+        return {"email": self.email, "name": self.name, "created_at": self.created_at.isoformat()}
+
+    def accepts(self, issued_at) -> bool:
+        """False for tokens issued before users.tokens_valid_after."""
+        if self.tokens_valid_after is None:
+            return True
+        cutoff = int(self.tokens_valid_after.replace(tzinfo=timezone.utc).timestamp())
+        return issued_at is not None and issued_at >= cutoff
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of principals by user id, each entry valid for `ttl` seconds.
+
+    invalidate() also marks tokens issued before now as untrusted so claim-only
+    auth in this process re-checks the users table. The marker is only needed
+    while such tokens are young enough to be trusted from their claims
+    (`claims_max_age`), so it is dropped after that and capped at
+    `max_entries`. Other processes learn about the revocation from
+    users.tokens_valid_after once the token or their cache entry ages out.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, claims_max_age: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.claims_max_age = claims_max_age
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        self._revoked_before: OrderedDict[int, float] = OrderedDict()
+
+    def get(self, user_id: int) -> Principal | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        now = time.time()
+        self._entries.pop(user_id, None)
+        self._revoked_before[user_id] = now
+        self._revoked_before.move_to_end(user_id)
+        while self._revoked_before:
+            oldest = next(iter(self._revoked_before.values()))
+            if len(self._revoked_before) <= self.max_entries and oldest > now - self.claims_max_age:
+                break
+            self._revoked_before.popitem(last=False)
+
+    def trusts(self, user_id: int, issued_at) -> bool:
+        """True when a token's claims can stand in for the users row."""
+        if issued_at is None or time.time() - issued_at > self.claims_max_age:
+            return False
+        revoked = self._revoked_before.get(user_id)
+        return revoked is None or issued_at >= int(revoked)
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    claims_max_age=settings.AUTH_CLAIMS_MAX_AGE_SECONDS,
+)
+
+
+async def revoke_tokens(db: AsyncSession, user_id: int) -> None:
+    """
+    Call after changing a user's password or signing them out everywhere.
+    Every process rejects older tokens once its cache entry expires; the
+    caller commits.
+    """
+    from app.models.user import User
+    await db.execute(update(User).where(User.id == user_id).values(tokens_valid_after=datetime.utcnow()))
+    principal_cache.invalidate(user_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Call after deleting a user; a deleted row already fails the DB check."""
+    principal_cache.invalidate(user_id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db)
 ):
+    return await user_from_token(credentials.credentials, db)
+
+
+async def get_stream_user(
+    token: str | None = None,
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Like get_current_user, but since EventSource can't send headers it also
+    takes ?token=, which must be a stream token from POST /events/token.
+    """
+    if credentials:
+        return await user_from_token(credentials.credentials, db)
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return await user_from_token(token, db, scope=STREAM_SCOPE)
+
+
+async def user_from_token(token: str, db: AsyncSession, scope: str | None = None) -> Principal:
+    """`scope` is None for access tokens, STREAM_SCOPE for stream tokens; others are refused."""
     from app.models.user import User
     try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         user_id = int(payload.get("sub"))
     except (JWTError, TypeError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if payload.get("scope") != scope:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and "email" in payload and principal_cache.trusts(user_id, payload.get("iat")):
+        return Principal(
+            id=user_id,
+            email=payload["email"],
+            name=payload.get("name"),
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
-# from datetime import datetime, timedelta
-# from typing import Optional
-# from jose import JWTError, jwt
-# from passlib.context import CryptContext
-# from fastapi import Depends, HTTPException, status
-# from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-# from sqlalchemy.ext.asyncio import AsyncSession
-# from sqlalchemy import select
-# from app.core.config import settings
-# from app.core.database import get_db
-
-# pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
-# bearer_scheme = HTTPBearer()
-
-
-# def hash_password(password: str) -> str:
-#     return pwd_context.hash(password[:72])
-
-
-# def verify_password(plain: str, hashed: str) -> bool:
-#     return pwd_context.verify(plain[:72], hashed)
-
-
-# def create_access_token(user_id: int) -> str:
-#     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-#     return jwt.encode(
-#         {"sub": str(user_id), "exp": expire},
-#         settings.SECRET_KEY,
-#         algorithm="HS256"
-#     )
-
-
-# async def get_current_user(
-#     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-#     db: AsyncSession = Depends(get_db)
-# ):
-#     from app.models.user import User
-#     try:
-#         payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=["HS256"])
-#         user_id = int(payload.get("sub"))
-#     except (JWTError, TypeError):
-#         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-
-#     result = await db.execute(select(User).where(User.id == user_id))
-#     user = result.scalar_one_or_none()
-#     if not user:
-#         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-#     return user
\ No newline at end of file
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(principal)
+    if not principal.accepts(payload.get("iat")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return principal
@@ -4,9 +4,97 @@ class Settings(BaseSettings):
     APP_NAME: str = "Intentra"
     APP_ENV: str = "development"
     DATABASE_URL: str
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: str = ""  # required unless AI_PROVIDER=offline
     SECRET_KEY: str = "change-this-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    # Build the caller from signed token claims, skipping the users table
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    # Only for tokens younger than this; older ones go through the cache/DB
+    # check, which sees revocations made by other processes
+    AUTH_CLAIMS_MAX_AGE_SECONDS: float = 300
+    # Lifetime of the ?token= credential for GET /events/, only checked on connect
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
+    # Stored hashes with a different cost are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # ── Enrichment ────────────────────────────────────────────
+    # "inline" runs Gemini inside POST /saves, "queue" hands it to app.worker
+    ENRICHMENT_MODE: str = "inline"
+    ENRICHMENT_MAX_ATTEMPTS: int = 5
+    ENRICHMENT_BATCH_SIZE: int = 10
+    ENRICHMENT_POLL_SECONDS: float = 2.0
+    ENRICHMENT_LEASE_SECONDS: int = 300
+
+    # ── Screenshots ───────────────────────────────────────────
+    SCREENSHOT_MAX_UPLOAD_BYTES: int = 15 * 1024 * 1024
+    SCREENSHOT_MAX_SIDE: int = 1600
+    SCREENSHOT_JPEG_QUALITY: int = 80
+    # max differing dHash bits; -1 disables reuse. A match is only reused for
+    # identical pixels or the same page url, see screenshot_dedup.confirms
+    SCREENSHOT_DEDUP_DISTANCE: int = 6
+
+    # ── Decay ─────────────────────────────────────────────────
+    DECAY_CURVE: str = "linear"  # or "exponential"
+    DECAY_HALF_LIFE_DAYS: float = 14.0
+    # ETags of /insights and /saves/forgotten change at least this often,
+    # since the forgotten cutoff and decay move with the clock
+    CLOCK_ETAG_SECONDS: int = 300
+
+    # ── Embeddings ────────────────────────────────────────────
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_WAIT_MS: float = 5.0
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    QUERY_CACHE_SIZE: int = 1024
+    # Truncated (Matryoshka) copy of gemini-embedding-001 kept for the HNSW index.
+    # pgvector can't index the full 3072 dims, so search reads this column
+    # once app.commands.backfill_embeddings has filled existing rows.
+    EMBEDDING_INDEX_DIM: int = 768
+    SEARCH_EMBEDDING_COLUMN: str = "embedding"  # or "embedding_small"
+    HNSW_EF_SEARCH: int = 100
+    # The HNSW indexes are global, so the per-user filter runs after the scan.
+    # Iterative scans (pgvector >= 0.8) keep going until enough rows pass it;
+    # turn off on older pgvector, where a scan returns at most ef_search rows.
+    HNSW_ITERATIVE_SCAN: bool = True
+    # Two-stage search: Hamming pre-filter on binary-quantized embeddings, exact
+    # cosine rerank. Build its index with app.commands.build_search_indexes
+    # first; pick the candidate count from app.commands.quantized_search_report.
+    SEARCH_QUANTIZED: bool = False
+    SEARCH_RERANK_CANDIDATES: int = 200
+    # Hybrid search: full-text and vector results fused with reciprocal rank fusion
+    SEARCH_HYBRID: bool = True
+    SEARCH_FUSION_DEPTH: int = 30
+    SEARCH_RRF_K: int = 60
+    QUERY_CACHE_TTL_SECONDS: float = 3600
+
+    # ── AI result cache ───────────────────────────────────────
+    AI_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    AI_CACHE_PERSIST: bool = True
+
+    # ── Gemini calls ──────────────────────────────────────────
+    AI_PROVIDER: str = "gemini"  # or "offline": deterministic local models, no network
+    OFFLINE_LLM_LATENCY_MS: float = 0.0
+    OFFLINE_EMBED_LATENCY_MS: float = 0.0
+    OFFLINE_EMBEDDING_DIM: int = 3072  # must match saves.embedding
+    GEMINI_WARMUP: bool = True  # build model clients in on_startup instead of on first request
+    AI_MAX_WORKERS: int = 16
+    AI_MAX_PENDING: int = 64  # includes timed-out calls still holding a thread
+    AI_CALL_TIMEOUT_SECONDS: float = 20.0
+    AI_MAX_RETRIES: int = 2
+    AI_RETRY_BASE_SECONDS: float = 0.5
+    AI_BREAKER_FAILURES: int = 5
+    AI_BREAKER_RESET_SECONDS: float = 30.0
+
+    # ── Local intent classifier ───────────────────────────────
+    INTENT_LOCAL_ENABLED: bool = True
+    INTENT_LOCAL_THRESHOLD: float = 0.85  # below this, Gemini decides
+    INTENT_MODEL_PATH: str = "intent_model.npz"  # written by app.commands.train_intent_model
+    # How long the LLM call may wait for the embedding so the model can vote;
+    # 0 uses the model only when the embedding is already there (cache hit)
+    INTENT_EMBEDDING_WAIT_MS: float = 0.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,34 @@
+import sqlalchemy
+from app.core.config import settings
+
+# Base.metadata.create_all() only creates missing tables, it never alters
+# existing ones. Columns and indexes added after a table already exists
+# are patched in here. Every statement must be safe to run on each startup.
+SCHEMA_PATCHES = [
+    "ALTER TABLE saves ADD COLUMN IF NOT EXISTS enrichment_status VARCHAR(20) DEFAULT 'done'",
+    f"ALTER TABLE saves ADD COLUMN IF NOT EXISTS embedding_small vector({settings.EMBEDDING_INDEX_DIM})",
+    "CREATE INDEX IF NOT EXISTS ix_saves_embedding_small_hnsw ON saves "
+    "USING hnsw (embedding_small vector_cosine_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_saves_user_created_id ON saves (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_saves_user_created_open ON saves (user_id, created_at) "
+    "WHERE action_taken = false",
+    "ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0",
+    "ALTER TABLE saves ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT now()",
+    "ALTER TABLE saves ADD COLUMN IF NOT EXISTS change_version BIGINT NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_saves_user_change_version ON saves (user_id, change_version)",
+    "ALTER TABLE enrichment_jobs ADD COLUMN IF NOT EXISTS image_mime VARCHAR(50)",
+    "ALTER TABLE saves ADD COLUMN IF NOT EXISTS screenshot_hash BIGINT",
+    "ALTER TABLE saves ADD COLUMN IF NOT EXISTS screenshot_digest BYTEA",
+    "ALTER TABLE saves ADD COLUMN IF NOT EXISTS intent_source VARCHAR(20)",
+    "CREATE INDEX IF NOT EXISTS ix_saves_user_screenshot_hash ON saves (user_id, screenshot_hash) "
+    "WHERE screenshot_hash IS NOT NULL",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS tokens_valid_after TIMESTAMP",
+    # /saves/forgotten ranks on decay computed at query time, so nothing
+    # reads this one and it only slowed rescore_decay's updates
+    "DROP INDEX IF EXISTS ix_saves_user_decay_id",
+]
+
+
+async def apply_schema_patches(conn):
+    for statement in SCHEMA_PATCHES:
+        await conn.execute(sqlalchemy.text(statement))
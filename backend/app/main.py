@@ -1,10 +1,76 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api.routes import save_routes, search_routes, insights_routes, auth_routes
+from app.core.schema import apply_schema_patches
+from app.services.ai_cache import ai_cache
+from app.services.events import broker
+from app.services.gemini_client import gemini
+from app.services.intent_classifier import intent_classifier
+from app.api.routes import save_routes, search_routes, insights_routes, auth_routes, event_routes
 import sqlalchemy
 
+
+class StreamSafeGZipMiddleware(GZipMiddleware):
+    """GZip buffers small writes, which would hold back server-sent events."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/events"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class UploadLimitMiddleware:
+    """
+    Caps request bodies on upload paths while they arrive, before Starlette
+    spools the multipart form to disk. Rejects on Content-Length up front,
+    and counts bytes for chunked uploads that don't declare one.
+    """
+
+    def __init__(self, app, paths: tuple[str, ...], max_bytes: int):
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        too_large = PlainTextResponse("Upload too large", status_code=413)
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes and not rejected:
+                    rejected = True
+                    await too_large(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+
 app = FastAPI(title=settings.APP_NAME, version="0.2.0")
 
 app.add_middleware(
@@ -13,12 +79,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(StreamSafeGZipMiddleware, minimum_size=1024)
+# Form fields and multipart framing ride on top of the image itself
+app.add_middleware(UploadLimitMiddleware, paths=("/saves/screenshot",),
+                   max_bytes=settings.SCREENSHOT_MAX_UPLOAD_BYTES + 64 * 1024)
 
 app.include_router(auth_routes.router)
 app.include_router(save_routes.router)
 app.include_router(search_routes.router)
 app.include_router(insights_routes.router)
+app.include_router(event_routes.router)
 
 
 @app.on_event("startup")
@@ -26,13 +98,31 @@ async def on_startup():
     async with engine.begin() as conn:
         await conn.execute(sqlalchemy.text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(Base.metadata.create_all)
+        await apply_schema_patches(conn)
+    if settings.GEMINI_WARMUP:
+        await gemini.warm_up()
     print(f"✅ {settings.APP_NAME} v0.2.0 started — multi-user + auth enabled")
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await broker.stop()
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok", "app": settings.APP_NAME, "version": "0.2.0"}
 
+
+@app.get("/health/cache")
+async def cache_health():
+    return {"ai_cache": ai_cache.stats()}
+
+
+@app.get("/health/ai")
+async def ai_health():
+    return {"gemini": gemini.stats(), "intent_classifier": intent_classifier.stats()}
+
 # from fastapi import FastAPI
 # from fastapi.middleware.cors import CORSMiddleware
 # from app.core.config import settings
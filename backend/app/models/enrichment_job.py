@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, LargeBinary, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class EnrichmentJob(Base):
+    __tablename__ = "enrichment_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    save_id: Mapped[int] = mapped_column(
+        ForeignKey("saves.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+
+    # ── Queue state ───────────────────────────────────────────
+    # queued → running → (deleted on success) | queued (retry) | failed
+    status: Mapped[str] = mapped_column(String(20), default="queued", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    # ── Screenshot saves keep the raw upload until Vision has read it ──
+    image_data: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    image_mime: Mapped[str] = mapped_column(String(50), nullable=True)
+
+    # ── Timestamps ────────────────────────────────────────────
+    run_after: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    locked_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_enrichment_jobs_status_run_after", "status", "run_after"),
+    )
@@ -1,9 +1,19 @@
 from datetime import datetime
-from sqlalchemy import String, Text, Float, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import String, Text, Float, Boolean, BigInteger, DateTime, ForeignKey, Index, LargeBinary, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
+from app.core.config import settings
 from app.core.database import Base
 
+SEARCH_TSV_SQL = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(summary, '') || ' ' "
+    "|| coalesce(selected_text, '') || ' ' || coalesce(screenshot_text, ''))"
+)
+# 1 bit per dimension (sign) for the Hamming pre-filter. Indexed as an
+# expression by app.commands.build_search_indexes, only when quantized
+# search is used, so writes don't pay for it otherwise.
+EMBEDDING_BITS_SQL = "binary_quantize(embedding)::bit(3072)"
+
 
 class Save(Base):
     __tablename__ = "saves"
@@ -22,20 +32,65 @@ class Save(Base):
 
     # ── Screenshot ────────────────────────────────────
     screenshot_text: Mapped[str] = mapped_column(Text, nullable=True)
+    # 64-bit dHash, near-duplicates reuse an earlier save's Vision + AI results
+    screenshot_hash: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    # sha256 of the prepared pixels, confirms a dHash match (see screenshot_dedup)
+    screenshot_digest: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
 
     # ── Intent Engine ─────────────────────────────────────────
     intent: Mapped[str] = mapped_column(String(100), nullable=True)
     intent_confidence: Mapped[float] = mapped_column(Float, nullable=True)
+    # "llm", "rules", "model" or "fallback"; only llm labels train the local classifier
+    intent_source: Mapped[str] = mapped_column(String(20), nullable=True)
     suggested_action: Mapped[str] = mapped_column(String(512), nullable=True)
 
+    # ── Enrichment pipeline ───────────────────────────────────
+    # "done" once summary/intent/embedding are filled, "pending" while queued
+    enrichment_status: Mapped[str] = mapped_column(String(20), default="done", server_default="done")
+
     # ── Behavioral tracking ───────────────────────────────────
     action_taken: Mapped[bool] = mapped_column(Boolean, default=False)
     engagement_score: Mapped[float] = mapped_column(Float, default=0.0)
     decay_score: Mapped[float] = mapped_column(Float, default=0.0)
 
     # ── Embedding (pgvector) ──────────────────────────────────
-    embedding: Mapped[list] = mapped_column(Vector(3072), nullable=True)
+    # Deferred: only loaded when accessed, never by plain select(Save)
+    embedding: Mapped[list] = mapped_column(Vector(3072), nullable=True, deferred=True)
+    embedding_small: Mapped[list] = mapped_column(
+        Vector(settings.EMBEDDING_INDEX_DIM), nullable=True, deferred=True
+    )
 
     # ── Timestamps ────────────────────────────────────────────
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    last_opened_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
\ No newline at end of file
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    last_opened_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    # ── Sync ──────────────────────────────────────────────────
+    # user_stats.version of the last write, the cursor for GET /saves/changes
+    change_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_saves_embedding_small_hnsw",
+            "embedding_small",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding_small": "vector_cosine_ops"},
+        ),
+        # full-text search on SEARCH_TSV_SQL; existing tables get it from
+        # app.commands.build_search_indexes
+        Index("ix_saves_fulltext", text(SEARCH_TSV_SQL), postgresql_using="gin"),
+        # keyset pagination for /saves
+        Index("ix_saves_user_created_id", "user_id", "created_at", "id"),
+        # forgotten list: decay is computed at query time over open saves only
+        Index(
+            "ix_saves_user_created_open",
+            "user_id", "created_at",
+            postgresql_where=text("action_taken = false"),
+        ),
+        Index("ix_saves_user_change_version", "user_id", "change_version"),
+        Index(
+            "ix_saves_user_screenshot_hash",
+            "user_id", "screenshot_hash",
+            postgresql_where=text("screenshot_hash IS NOT NULL"),
+        ),
+    )
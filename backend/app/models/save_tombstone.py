@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Integer, BigInteger, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class SaveTombstone(Base):
+    """Deletion log read by GET /saves/changes."""
+    __tablename__ = "save_tombstones"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    save_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # user_stats.version of the delete
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_save_tombstones_user_version", "user_id", "version"),
+    )
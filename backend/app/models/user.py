@@ -12,5 +12,7 @@ class User(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Tokens issued before this (UTC) are rejected, see auth.revoke_tokens
+    tokens_valid_after: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
     saves: Mapped[list] = relationship("Save", back_populates="user", cascade="all, delete")
\ No newline at end of file
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Integer, BigInteger, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class UserStats(Base):
+    """Per-user counters kept in step with saves so /insights is one row read."""
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    acted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # {"learning": 12, "unclassified": 1, ...}
+    intent_counts: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+    # Bumped by every write to the user's saves; drives ETags on list endpoints
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -19,16 +19,53 @@ class SaveResponse(BaseModel):
     intent: Optional[str]
     intent_confidence: Optional[float]
     suggested_action: Optional[str]
+    enrichment_status: Optional[str] = None
     action_taken: bool
     engagement_score: float
     decay_score: float
     created_at: datetime
+    updated_at: Optional[datetime] = None
     last_opened_at: Optional[datetime]
 
     class Config:
         from_attributes = True
 
 
+class SaveListItem(BaseModel):
+    """
+    Row in list and search responses. selected_text and screenshot_text are
+    previews, GET /saves/{id} has the full text. With ?fields= only the
+    requested keys are sent.
+    """
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    selected_text: Optional[str] = None
+    summary: Optional[str] = None
+    screenshot_text: Optional[str] = None
+    intent: Optional[str] = None
+    intent_confidence: Optional[float] = None
+    suggested_action: Optional[str] = None
+    enrichment_status: Optional[str] = None
+    action_taken: Optional[bool] = None
+    engagement_score: Optional[float] = None
+    decay_score: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_opened_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SaveChanges(BaseModel):
+    """GET /saves/changes: pass `cursor` back as `since` on the next poll."""
+    changes: list[SaveListItem]
+    deleted: list[int]
+    cursor: str
+    has_more: bool = False
+
+
 class SaveUpdate(BaseModel):
     action_taken: Optional[bool] = None
     engagement_score: Optional[float] = None
@@ -0,0 +1,120 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.ai_cache_entry import AICacheEntry
+
+
+def normalize(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def cache_key(kind: str, model: str, *parts: str) -> str:
+    if settings.AI_PROVIDER != "gemini":
+        model = f"{settings.AI_PROVIDER}:{model}"  # never mix offline results into Gemini's
+    h = hashlib.sha256()
+    for piece in (kind, model, *parts):
+        h.update(normalize(piece).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def approx_size(value: Any) -> int:
+    """Rough sys.getsizeof of value and everything it holds."""
+    if isinstance(value, str):
+        return len(value) + 50
+    if isinstance(value, (list, tuple)):
+        # An 8-byte slot per item plus the item itself: a 3072-float
+        # embedding is about 98 KB
+        return sum(approx_size(v) + 8 for v in value) + 56
+    if isinstance(value, dict):
+        return sum(approx_size(v) + len(k) for k, v in value.items()) + 100
+    if isinstance(value, (int, float)):
+        return 24
+    return 32
+
+
+class AICache:
+    """
+    Content-addressed cache for Gemini results.
+    An in-process LRU tier bounded by approximate bytes sits in front of
+    the persistent ai_cache table, so results survive restarts and are
+    shared between API pods and workers.
+    """
+
+    def __init__(self, max_bytes: int, persist: bool = True):
+        self.max_bytes = max_bytes
+        self.persist = persist
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry[0]
+
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    value = (await db.execute(
+                        select(AICacheEntry.value).where(AICacheEntry.key == key)
+                    )).scalar_one_or_none()
+                if value is not None:
+                    self.db_hits += 1
+                    self._remember(key, value)
+                    return value
+            except Exception as e:
+                print(f"[ai_cache] read error: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, kind: str, model: str, value: Any) -> None:
+        self._remember(key, value)
+        if not self.persist:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    insert(AICacheEntry)
+                    .values(key=key, kind=kind, model=model, value=value)
+                    .on_conflict_do_nothing(index_elements=["key"])
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"[ai_cache] write error: {e}")
+
+    def _remember(self, key: str, value: Any) -> None:
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+ai_cache = AICache(max_bytes=settings.AI_CACHE_MAX_BYTES, persist=settings.AI_CACHE_PERSIST)
@@ -1,16 +1,26 @@
-import asyncio
-import google.generativeai as genai
-from app.core.config import settings
+from app.services.ai_cache import ai_cache, cache_key
+from app.services.gemini_client import gemini
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+MODEL_NAME = "models/gemini-2.5-flash"
+model = gemini.model(MODEL_NAME)
 
-model = genai.GenerativeModel("models/gemini-2.5-flash")
+SUMMARY_UNAVAILABLE = "AI service temporarily unavailable."
+
+
+def summarizable(text: str | None) -> bool:
+    """Below this, generate_summary answers without calling Gemini."""
+    return bool(text) and len(text.strip()) >= 30
 
 
 async def generate_summary(text: str) -> str:
-    if not text or len(text.strip()) < 30:
+    if not summarizable(text):
         return "No summary available."
 
+    key = cache_key("summary", MODEL_NAME, text[:3000])
+    cached = await ai_cache.get(key)
+    if cached is not None:
+        return cached
+
     prompt = f"""
 Summarize the following content in 2-3 clear sentences.
 Be concise. No preamble.
@@ -22,14 +32,16 @@ Summary:
 """
 
     try:
-        response = await asyncio.to_thread(
+        response = await gemini.call(
             model.generate_content,
             prompt
         )
-        return response.text.strip()
+        summary = response.text.strip()
+        await ai_cache.set(key, "summary", MODEL_NAME, summary)
+        return summary
     except Exception as e:
         print("[ai_service] ERROR:", e)
-        return "AI service temporarily unavailable."
+        return SUMMARY_UNAVAILABLE
 
 # import asyncio
 # import google.generativeai as genai
@@ -1,13 +1,41 @@
 from datetime import datetime
+from sqlalchemy import Float, Numeric, cast, func
+from app.core.config import settings
 
+# ── Curves ────────────────────────────────────────────────────
+# linear:      one point per day since the save
+# exponential: 1 - 0.5^(days / half_life), saturates at 1.0
+# Each curve has a Python and a SQL form that must agree.
 
-def calculate_decay(created_at: datetime, engagement_score: float) -> float:
+PY_CURVES = {
+    "linear": lambda days: days,
+    "exponential": lambda days: 1 - 0.5 ** (days / settings.DECAY_HALF_LIFE_DAYS),
+}
+
+SQL_CURVES = {
+    "linear": lambda days: days,
+    "exponential": lambda days: 1 - func.power(0.5, days / settings.DECAY_HALF_LIFE_DAYS),
+}
+
+
+def calculate_decay(created_at: datetime, engagement_score: float, curve: str | None = None) -> float:
     """
     Higher decay = more forgotten = should be resurfaced.
 
-    Formula: days_since_save * (1 - engagement_score)
+    Formula: curve(days_since_save) * (1 - engagement_score)
     Range: 0.0 (fresh/engaged) → high float (forgotten)
     """
     days_since_save = (datetime.utcnow() - created_at).days
-    decay = days_since_save * (1 - max(0.0, min(1.0, engagement_score)))
-    return round(decay, 2)
\ No newline at end of file
+    decay = PY_CURVES[curve or settings.DECAY_CURVE](days_since_save) * (1 - max(0.0, min(1.0, engagement_score)))
+    return round(decay, 2)
+
+
+def decay_sql(created_at, engagement_score, curve: str | None = None):
+    """
+    calculate_decay as a SQL expression, evaluated against the database
+    clock inside the query so rankings are never stale.
+    """
+    days_since_save = func.floor(func.extract("epoch", func.localtimestamp() - created_at) / 86400)
+    engagement = func.greatest(0.0, func.least(1.0, func.coalesce(engagement_score, 0.0)))
+    decay = SQL_CURVES[curve or settings.DECAY_CURVE](days_since_save) * (1 - engagement)
+    return cast(func.round(cast(decay, Numeric), 2), Float)
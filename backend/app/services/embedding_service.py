@@ -1,22 +1,163 @@
-import google.generativeai as genai
+import asyncio
+import time
+from collections import OrderedDict
 from app.core.config import settings
+from app.services.ai_cache import ai_cache, cache_key
+from app.services.gemini_client import gemini
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+EMBEDDING_MODEL = "models/gemini-embedding-001"
 
 
-async def generate_embedding(text: str) -> list[float] | None:
+def shrink_embedding(embedding: list[float] | None, dim: int = settings.EMBEDDING_INDEX_DIM) -> list[float] | None:
+    """Matryoshka truncation: keep the first `dim` values and re-normalize."""
+    if not embedding:
+        return None
+    head = embedding[:dim]
+    norm = sum(x * x for x in head) ** 0.5
+    return [x / norm for x in head] if norm else head
+
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent embedding requests for a few milliseconds and sends
+    them to Gemini as one batch call, off the event loop. Each caller awaits
+    its own future and gets its own vector back.
+    """
+
+    def __init__(self, batch_size: int, wait_ms: float, max_concurrency: int):
+        self.batch_size = batch_size
+        self.wait = wait_ms / 1000
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, text: str, task_type: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(task_type, [])
+        batch.append((text, future))
+
+        if len(batch) >= self.batch_size:
+            self._flush(task_type)
+        elif len(batch) == 1:
+            self._timers[task_type] = loop.call_later(self.wait, self._flush, task_type)
+
+        return await future
+
+    def _flush(self, task_type: str) -> None:
+        timer = self._timers.pop(task_type, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(task_type, None)
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send(task_type, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, task_type: str, batch: list[tuple[str, asyncio.Future]]) -> None:
+        async with self._semaphore:
+            try:
+                response = await gemini.call(
+                    gemini.embed_content,
+                    model=EMBEDDING_MODEL,
+                    content=[text for text, _ in batch],
+                    task_type=task_type
+                )
+                vectors = response["embedding"]
+                if len(vectors) != len(batch):
+                    raise ValueError(f"expected {len(batch)} embeddings, got {len(vectors)}")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+batcher = EmbeddingBatcher(
+    batch_size=settings.EMBEDDING_BATCH_SIZE,
+    wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+    max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+)
+
+
+async def generate_embedding(text: str, task_type: str = "retrieval_document") -> list[float] | None:
     if not text or len(text.strip()) < 5:
         return None
 
-    try:
-        response = genai.embed_content(
-            model="models/gemini-embedding-001",
-            content=text[:2000],
-            task_type="retrieval_document"
-        )
+    key = cache_key("embedding", EMBEDDING_MODEL, task_type, text[:2000])
+    cached = await ai_cache.get(key)
+    if cached is not None:
+        return cached
 
-        return response["embedding"]
+    try:
+        embedding = await batcher.embed(text[:2000], task_type)
+        await ai_cache.set(key, "embedding", EMBEDDING_MODEL, embedding)
+        return embedding
 
     except Exception as e:
         print(f"Embedding error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+class QueryEmbeddingCache:
+    """
+    LRU + TTL cache of search-query embeddings keyed by normalized query.
+    Identical queries already in flight share one embedding call.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    async def get(self, query: str) -> list[float] | None:
+        key = self.normalize(query)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, vector = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return vector
+            del self._entries[key]
+
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        vector = None
+        try:
+            vector = await generate_embedding(key)
+        finally:
+            # waiters fall back to keyword search if the leader was cancelled
+            future.set_result(vector)
+            self._inflight.pop(key, None)
+
+        if vector is not None:
+            self._entries[key] = (time.monotonic() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+
+query_cache = QueryEmbeddingCache(
+    max_entries=settings.QUERY_CACHE_SIZE,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+)
+
+
+async def embed_query(query: str) -> list[float] | None:
+    return await query_cache.get(query)
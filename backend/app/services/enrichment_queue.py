@@ -0,0 +1,146 @@
+import random
+from datetime import timedelta
+from sqlalchemy import select, or_, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.save import Save
+from app.models.enrichment_job import EnrichmentJob
+from app.services.enrichment_service import enrich_save, EnrichmentFailed
+from app.services.user_stats import bump_stats, record_enriched
+from app.services.events import publish
+from app.services.screenshot_service import extract_text_from_screenshot
+
+
+# ── Producer side (API) ───────────────────────────────────────
+
+def enqueue_enrichment(
+    db: AsyncSession, save: Save, image_data: bytes | None = None, image_mime: str | None = None
+) -> None:
+    """Add the job for a flushed, pending Save to the same transaction."""
+    db.add(EnrichmentJob(save_id=save.id, image_data=image_data, image_mime=image_mime or "image/png"))
+
+
+# ── Consumer side (app.worker) ────────────────────────────────
+
+def retry_delay(attempts: int) -> timedelta:
+    base = min(600, 5 * 2 ** attempts)
+    return timedelta(seconds=base + random.uniform(0, base / 2))
+
+
+async def claim_jobs(db: AsyncSession, limit: int) -> list[int]:
+    """
+    Lock up to `limit` runnable jobs with FOR UPDATE SKIP LOCKED so any number
+    of workers can poll the same table without handing out a job twice.
+    Jobs left "running" past their lease belong to a dead worker and are
+    reclaimed, unless that was their last attempt.
+    """
+    lease = timedelta(seconds=settings.ENRICHMENT_LEASE_SECONDS)
+    expired = and_(EnrichmentJob.status == "running", EnrichmentJob.locked_at < func.now() - lease)
+    await fail_abandoned(db, expired, limit)
+    result = await db.execute(
+        select(EnrichmentJob)
+        .where(or_(
+            and_(EnrichmentJob.status == "queued", EnrichmentJob.run_after <= func.now()),
+            and_(expired, EnrichmentJob.attempts < settings.ENRICHMENT_MAX_ATTEMPTS),
+        ))
+        .order_by(EnrichmentJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = result.scalars().all()
+    for job in jobs:
+        job.status = "running"
+        job.attempts += 1
+        job.locked_at = func.now()
+    await db.commit()
+    return [job.id for job in jobs]
+
+
+async def fail_abandoned(db: AsyncSession, expired, limit: int) -> None:
+    """
+    A job whose lease ran out on its last attempt most likely took its
+    worker down with it (OOM or a crash on a huge image). Mark it and its
+    save failed rather than hand it to the next worker. Committed by the caller.
+    """
+    result = await db.execute(
+        select(EnrichmentJob)
+        .where(expired, EnrichmentJob.attempts >= settings.ENRICHMENT_MAX_ATTEMPTS)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    for job in result.scalars().all():
+        print(f"[enrichment_queue] job {job.id} abandoned after {job.attempts} attempts")
+        save = await db.get(Save, job.save_id)
+        if not save:
+            await db.delete(job)
+            continue
+        job.last_error = "lease expired, the worker died while processing it"
+        await mark_failed(db, job, save)
+
+
+async def mark_failed(db: AsyncSession, job: EnrichmentJob, save: Save) -> None:
+    job.status = "failed"
+    job.locked_at = None
+    save.enrichment_status = "failed"
+    save.change_version = await bump_stats(db, save.user_id)
+    await publish(db, save.user_id, "save.updated", save.id,
+                  version=save.change_version, enrichment_status="failed")
+
+
+async def process_job(job_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        job = await db.get(EnrichmentJob, job_id)
+        if not job:
+            return
+        save = await db.get(Save, job.save_id)
+        if not save:
+            await db.delete(job)
+            await db.commit()
+            return
+
+        attempt = job.attempts
+        try:
+            if job.image_data is not None and not save.screenshot_text:
+                screenshot_text = await extract_text_from_screenshot(job.image_data, job.image_mime or "image/png")
+                if not screenshot_text:
+                    raise EnrichmentFailed("screenshot text unavailable")
+                save.screenshot_text = screenshot_text
+            previous_intent = save.intent
+            await enrich_save(save, strict=True)
+            save.change_version = await record_enriched(db, save.user_id, previous_intent, save.intent)
+            await publish(db, save.user_id, "save.enriched", save.id,
+                          version=save.change_version, intent=save.intent)
+            await db.delete(job)
+            await db.commit()
+            return
+        except Exception as e:
+            print(f"[enrichment_queue] job {job_id} attempt {attempt} failed: {e}")
+            error = str(e)[:1000]
+            # A failed flush (e.g. the save was deleted mid-enrichment) leaves
+            # the session unusable, so the failure is recorded in a new one.
+            await db.rollback()
+
+    await record_failure(job_id, error)
+
+
+async def record_failure(job_id: int, error: str) -> None:
+    """Requeue with backoff, or mark failed after the last attempt. Job or save may be gone by now."""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(EnrichmentJob, job_id)
+        if not job:
+            return
+        save = await db.get(Save, job.save_id)
+        if not save:
+            await db.delete(job)
+            await db.commit()
+            return
+
+        job.last_error = error
+        job.locked_at = None
+        if job.attempts >= settings.ENRICHMENT_MAX_ATTEMPTS:
+            await mark_failed(db, job, save)
+        else:
+            job.status = "queued"
+            job.run_after = func.now() + retry_delay(job.attempts)
+        await db.commit()
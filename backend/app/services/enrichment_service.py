@@ -0,0 +1,135 @@
+import asyncio
+from app.core.config import settings
+from app.models.save import Save
+from app.services.ai_cache import ai_cache, cache_key
+from app.services.ai_service import SUMMARY_UNAVAILABLE, generate_summary, summarizable
+from app.services.intent_service import VALID_INTENTS, INTENT_GUIDE, fallback, parse_json_response
+from app.services.embedding_service import generate_embedding, shrink_embedding
+from app.services.gemini_client import gemini
+from app.services.intent_classifier import intent_classifier
+
+MODEL_NAME = "models/gemini-2.5-flash"
+model = gemini.model(
+    MODEL_NAME,
+    generation_config={"response_mime_type": "application/json"},
+)
+
+
+class EnrichmentFailed(Exception):
+    """Raised when Gemini gave us fallbacks instead of real results."""
+
+
+async def analyze_content(title: str, url: str, content: str, text: str) -> dict:
+    """
+    One Gemini round trip for what generate_summary and classify_intent
+    used to ask separately. Returns summary, intent, confidence and
+    suggested_action with the same short-input and error fallbacks.
+    """
+    combined_text = f"""
+Title: {title}
+URL: {url}
+Content: {content[:2500]}
+"""
+    wants_summary = summarizable(text)
+
+    if len(combined_text.strip()) < 20:
+        return {"summary": "No summary available.", **fallback(), "source": "fallback"}
+
+    prompt = f"""
+You are an AI that summarizes saved content and infers USER INTENT behind it.
+
+Your job:
+1. Summarize the content in 2-3 clear sentences. Be concise. No preamble.
+2. Determine WHY the user saved this. Infer motivation, not just topic.
+
+{INTENT_GUIDE}
+Return ONLY raw JSON:
+{{"summary": "<2-3 sentences>", "intent": "<valid>", "confidence": <0-1>, "suggested_action": "<short next step>"}}
+
+Content:
+{combined_text}
+"""
+
+    key = cache_key("analysis", MODEL_NAME, title, url, content[:2500])
+    result = await ai_cache.get(key)
+
+    try:
+        if result is None:
+            response = await gemini.call(
+                model.generate_content,
+                prompt
+            )
+
+            result = parse_json_response(response.text)
+
+            if result.get("intent") not in VALID_INTENTS:
+                result["intent"] = "other"
+            await ai_cache.set(key, "analysis", MODEL_NAME, result)
+
+        result = dict(result)
+        summary = (result.get("summary") or "").strip()
+        result["summary"] = summary if wants_summary and summary else "No summary available."
+
+        return result
+
+    except Exception as e:
+        print("[enrichment_service] ERROR:", e)
+        return {"summary": SUMMARY_UNAVAILABLE, **fallback(), "source": "fallback"}
+
+
+def enrichment_text(save: Save) -> str:
+    if save.screenshot_text:
+        return save.screenshot_text
+    return " ".join(filter(None, [save.title, save.selected_text]))
+
+
+async def enrich_save(save: Save, strict: bool = False) -> None:
+    """
+    Fill summary, intent, suggested_action and embedding on a Save.
+    The embedding call starts first. If the local intent classifier is
+    confident, Gemini is only asked for a summary, and only when there is
+    text to summarize. Otherwise the combined LLM call decides. Domain
+    rules always run. The trained model runs only if the embedding is ready
+    within INTENT_EMBEDDING_WAIT_MS, so by default a cold embedding never
+    delays the LLM call.
+
+    With strict=True nothing is written and EnrichmentFailed is raised when
+    the AI services fell back, so the queue can retry later.
+    """
+    raw_text = enrichment_text(save)
+    embedding_task = asyncio.ensure_future(generate_embedding(raw_text))
+
+    local = None
+    if settings.INTENT_LOCAL_ENABLED:
+        local = intent_classifier.classify_url(save.url)
+        if local is None and intent_classifier.model is not None:
+            await asyncio.wait({embedding_task}, timeout=settings.INTENT_EMBEDDING_WAIT_MS / 1000)
+            if embedding_task.done():
+                local = intent_classifier.classify_embedding(shrink_embedding(embedding_task.result()))
+        intent_classifier.record(local, summary_call=summarizable(raw_text))
+
+    if local is None:
+        analysis = await analyze_content(
+            title=save.title or "",
+            url=save.url or "",
+            content=save.screenshot_text or save.selected_text or save.title or "",
+            text=raw_text,
+        )
+    else:
+        analysis = {"summary": await generate_summary(raw_text), **local}
+    embedding = await embedding_task
+
+    if strict:
+        if analysis["summary"] == SUMMARY_UNAVAILABLE:
+            raise EnrichmentFailed("summary unavailable")
+        if embedding is None and len(raw_text.strip()) >= 5:
+            raise EnrichmentFailed("embedding unavailable")
+
+    save.summary = analysis["summary"]
+    save.intent = analysis.get("intent")
+    save.intent_confidence = analysis.get("confidence")
+    save.suggested_action = analysis.get("suggested_action")
+    save.intent_source = analysis.get("source", "llm")
+    save.embedding = embedding
+    save.embedding_small = shrink_embedding(embedding)
+    save.enrichment_status = "done"
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+CHANNEL = "intentra_events"
+QUEUE_SIZE = 100
+
+
+async def publish(db: AsyncSession, user_id: int, event_type: str, save_id: int, **data) -> None:
+    """
+    Queue a NOTIFY in the caller's transaction. Postgres delivers it to
+    every listening process on commit and drops it on rollback.
+    """
+    payload = {"user_id": user_id, "type": event_type, "id": save_id, **data}
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": json.dumps(payload, default=str)}
+    )
+
+
+def listen_dsn(url: str) -> str:
+    """asyncpg wants a plain postgresql:// DSN, without the SQLAlchemy driver suffix."""
+    for prefix in ("postgresql+asyncpg://", "postgresql+psycopg2://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql://" + url[len(prefix):]
+    return url
+
+
+class EventBroker:
+    """
+    One LISTEN connection per process, fanned out to per-user queues.
+    Subscribers that fall behind, or that were connected while the
+    LISTEN connection dropped, get a "resync" event.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._conn: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            self._conn = await asyncpg.connect(listen_dsn(settings.DATABASE_URL))
+            self._conn.add_termination_listener(self._on_terminated)
+            await self._conn.add_listener(CHANNEL, self._on_notify)
+
+    async def stop(self) -> None:
+        if self._reconnect:
+            self._reconnect.cancel()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int):
+        await self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id, set())
+            queues.discard(queue)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        event = json.loads(payload)
+        for queue in self._subscribers.get(event.get("user_id"), ()):
+            self._deliver(queue, event)
+
+    def _deliver(self, queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to replay, tell the client to refetch instead
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+
+    def _on_terminated(self, conn) -> None:
+        print("[events] LISTEN connection lost, reconnecting")
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._deliver(queue, {"type": "resync"})
+        if self._subscribers and (self._reconnect is None or self._reconnect.done()):
+            self._reconnect = asyncio.ensure_future(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        delay = 1.0
+        while self._subscribers:
+            try:
+                await self.start()
+                return
+            except Exception as e:
+                print(f"[events] reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+broker = EventBroker()
@@ -0,0 +1,222 @@
+import asyncio
+import functools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from app.core.config import settings
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised instead of calling Gemini while the breaker is open or the executor is full."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. After `failure_threshold` failures it opens
+    and rejects calls for `reset_seconds`, then lets a single probe through:
+    success closes it, failure opens it again. A probe that ends with
+    neither (cancelled, rejected locally) calls release_probe() so the next
+    caller can probe. Only touched from the event loop.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if not self._probing and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                print(f"[gemini_client] circuit open after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+def _retryable(e: Exception) -> bool:
+    """google.api_core errors carry an HTTP code; other 4xx won't succeed on retry."""
+    code = getattr(e, "code", None)
+    return not (isinstance(code, int) and 400 <= code < 500 and code not in (408, 429))
+
+
+class LazyModel:
+    """
+    Stands in for a genai.GenerativeModel. The SDK model is built by the
+    registry on first attribute access, so `model.generate_content` works
+    unchanged at call sites.
+    """
+
+    def __init__(self, registry: "GeminiRegistry", name: str, generation_config: dict | None = None):
+        self._registry = registry
+        self.name = name
+        self.generation_config = generation_config
+
+    def resolve(self):
+        return self._registry.build(self.name, self.generation_config)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
+
+class GeminiRegistry:
+    """
+    One place that imports and configures the provider, and one
+    GenerativeModel per (name, generation_config), created on first use
+    and shared by every service. Importing app.* never touches the SDK.
+
+    A provider is a module with google.generativeai's surface as used
+    here: configure(api_key), GenerativeModel(name, generation_config)
+    whose generate_content() returns an object with .text, and
+    embed_content(model, content, task_type) -> {"embedding": ...}.
+    """
+
+    def __init__(self, api_key: str | None, provider: str = "gemini"):
+        self.api_key = api_key
+        self.provider = provider
+        self._genai = None
+        self._models: dict[tuple, Any] = {}
+        self._declared: dict[tuple, LazyModel] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=settings.AI_MAX_WORKERS, thread_name_prefix="gemini")
+        self._pending = 0
+        self.breaker = CircuitBreaker(settings.AI_BREAKER_FAILURES, settings.AI_BREAKER_RESET_SECONDS)
+
+    @staticmethod
+    def _key(name: str, generation_config: dict | None) -> tuple:
+        return (name, tuple(sorted((generation_config or {}).items())))
+
+    @property
+    def genai(self):
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    if self.provider == "offline":
+                        from app.services import offline_provider as genai
+                    else:
+                        import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._genai = genai
+        return self._genai
+
+    def model(self, name: str, generation_config: dict | None = None) -> LazyModel:
+        """Declare a model at import time; it is built on first call or warm_up()."""
+        key = self._key(name, generation_config)
+        if key not in self._declared:
+            self._declared[key] = LazyModel(self, name, generation_config)
+        return self._declared[key]
+
+    def build(self, name: str, generation_config: dict | None = None):
+        key = self._key(name, generation_config)
+        model = self._models.get(key)
+        if model is None:
+            genai = self.genai
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = genai.GenerativeModel(name, generation_config=generation_config)
+                    self._models[key] = model
+        return model
+
+    def embed_content(self, **kwargs):
+        return self.genai.embed_content(**kwargs)
+
+    # ── Calls ─────────────────────────────────────────────────
+    # Every blocking SDK call runs on this registry's own bounded pool, so a
+    # Gemini brownout can't starve asyncio's default executor. A call that
+    # times out keeps its thread until the SDK returns; _pending counts those
+    # too, and past AI_MAX_PENDING we fail fast instead of queueing.
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._pending -= 1
+        if not future.cancelled():
+            future.exception()  # mark retrieved when nobody awaited it
+
+    async def _run_once(self, fn, timeout: float):
+        self._pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn)
+        future.add_done_callback(self._release)
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    async def call(self, fn, *args, timeout: float | None = None, **kwargs):
+        """
+        Run a blocking SDK call with a deadline, retrying transient errors
+        with full-jitter backoff. Raises ProviderUnavailable without calling
+        out while the breaker is open; callers keep their own fallbacks.
+        """
+        timeout = timeout or settings.AI_CALL_TIMEOUT_SECONDS
+        fn = functools.partial(fn, *args, **kwargs)
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            # Saturation is checked first so it never consumes the half-open probe
+            if self._pending >= settings.AI_MAX_PENDING:
+                raise ProviderUnavailable("AI executor saturated")
+            if not self.breaker.allow():
+                raise ProviderUnavailable("Gemini circuit open")
+            try:
+                result = await self._run_once(fn, timeout)
+            except Exception as e:
+                # A 4xx is about this request (bad image, invalid argument),
+                # not the provider, so it must not open the circuit for everyone
+                if not _retryable(e):
+                    raise
+                self.breaker.record_failure()
+                if attempt == settings.AI_MAX_RETRIES:
+                    raise
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                self.breaker.release_probe()  # no-op after record_*; frees the probe on cancellation
+            await asyncio.sleep(random.uniform(0, settings.AI_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.provider,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "pending": self._pending,
+            "models": len(self._models),
+        }
+
+    def _warm(self) -> int:
+        for lazy in list(self._declared.values()):
+            lazy.resolve()
+        return len(self._declared)
+
+    async def warm_up(self) -> None:
+        """Import the SDK and build every declared model off the event loop."""
+        try:
+            count = await asyncio.to_thread(self._warm)
+            print(f"[gemini_client] warmed {count} models")
+        except Exception as e:
+            print("[gemini_client] warm-up failed:", e)
+
+
+gemini = GeminiRegistry(settings.GEMINI_API_KEY, settings.AI_PROVIDER)
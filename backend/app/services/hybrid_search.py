@@ -0,0 +1,61 @@
+import asyncio
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.save import SEARCH_TSV_SQL
+from app.services.embedding_service import embed_query
+from app.services.vector_search import vector_search
+
+
+async def lexical_search(user_id: int, q: str, limit: int, columns: str = "id"):
+    """
+    Full-text match on SEARCH_TSV_SQL, best ts_rank first. The expression
+    must stay identical to the one ix_saves_fulltext indexes.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(f"""
+                SELECT {columns} FROM saves
+                WHERE user_id = :user_id AND {SEARCH_TSV_SQL} @@ websearch_to_tsquery('english', :q)
+                ORDER BY ts_rank_cd({SEARCH_TSV_SQL}, websearch_to_tsquery('english', :q)) DESC
+                LIMIT :limit
+            """),
+            {"user_id": user_id, "q": q, "limit": limit}
+        )
+        return result.mappings().all()
+
+
+async def semantic_search_rows(user_id: int, q: str, limit: int, columns: str = "id"):
+    """None when the query could not be embedded."""
+    query_embedding = await embed_query(q)
+    if not query_embedding:
+        return None
+    async with AsyncSessionLocal() as db:
+        return await vector_search(db, user_id, query_embedding, limit=limit, columns=columns)
+
+
+def reciprocal_rank_fusion(*rankings, k: int = 60, limit: int = 10) -> list:
+    """Merge ranked row lists by sum of 1 / (k + rank); rows are keyed on id."""
+    scores: dict[int, float] = {}
+    rows: dict[int, dict] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking or [], start=1):
+            scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (k + rank)
+            rows.setdefault(row["id"], row)
+    best = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [rows[save_id] for save_id in best]
+
+
+async def hybrid_search(user_id: int, q: str, limit: int = 10, columns: str = "id"):
+    """
+    Runs the lexical query and the embed + vector query concurrently on
+    separate connections and fuses them. Returns (rows, semantic_ok) so the
+    caller knows when it only got keyword results.
+    """
+    depth = settings.SEARCH_FUSION_DEPTH
+    lexical_rows, vector_rows = await asyncio.gather(
+        lexical_search(user_id, q, depth, columns),
+        semantic_search_rows(user_id, q, depth, columns),
+    )
+    fused = reciprocal_rank_fusion(lexical_rows, vector_rows, k=settings.SEARCH_RRF_K, limit=limit)
+    return fused, vector_rows is not None
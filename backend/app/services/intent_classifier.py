@@ -0,0 +1,191 @@
+import re
+from pathlib import Path
+from urllib.parse import urlparse
+import numpy as np
+from app.core.config import settings
+from app.services.intent_service import VALID_INTENTS
+
+# (host, path pattern, intent, confidence). Hosts match exactly after
+# dropping "www." or "m.", so subdomains such as aws.amazon.com or
+# jobs.netflix.com are left to the model and the LLM. Path patterns are
+# searched in the URL path. First match wins.
+DOMAIN_RULES = [
+    ("linkedin.com", r"^/jobs(/|$)", "career", 0.95),
+    ("indeed.com", "", "career", 0.95),
+    ("glassdoor.com", "", "career", 0.9),
+    ("wellfound.com", r"^/jobs(/|$)", "career", 0.9),
+    ("jobs.lever.co", "", "career", 0.9),
+    ("boards.greenhouse.io", "", "career", 0.9),
+    ("job-boards.greenhouse.io", "", "career", 0.9),
+    ("amazon.com", r"/(dp|gp/product)/", "shopping", 0.95),
+    ("amazon.in", r"/(dp|gp/product)/", "shopping", 0.95),
+    ("amazon.co.uk", r"/(dp|gp/product)/", "shopping", 0.95),
+    ("flipkart.com", r"/p/", "shopping", 0.95),
+    ("ebay.com", r"^/itm/", "shopping", 0.95),
+    ("etsy.com", r"^/listing/", "shopping", 0.95),
+    ("github.com", "", "learning", 0.9),
+    ("arxiv.org", "", "learning", 0.95),
+    ("stackoverflow.com", r"^/questions/", "learning", 0.9),
+    ("coursera.org", r"^/(learn|specializations|professional-certificates)/", "learning", 0.95),
+    ("udemy.com", r"^/course/", "learning", 0.95),
+    ("khanacademy.org", "", "learning", 0.95),
+    ("producthunt.com", r"^/(posts|products)/", "startup", 0.85),
+    ("crunchbase.com", r"^/organization/", "startup", 0.9),
+    ("netflix.com", r"^/(title|watch)/", "entertainment", 0.95),
+    ("9gag.com", "", "entertainment", 0.95),
+    ("tiktok.com", r"/video/", "entertainment", 0.85),
+]
+
+SUGGESTED_ACTIONS = {
+    "learning": "Block 20 minutes to work through this.",
+    "career": "Apply or add it to your job tracker this week.",
+    "startup": "Write down one next step to validate the idea.",
+    "shopping": "Decide to buy it or drop it from your wishlist.",
+    "entertainment": "Save it for your next break.",
+    "self-improvement": "Pick one takeaway and try it today.",
+    "other": "Review this save manually.",
+}
+
+
+def rule_intent(url: str | None) -> tuple[str, float] | None:
+    if not url:
+        return None
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    host = host.removeprefix("www.").removeprefix("m.")
+    for rule_host, path, intent, confidence in DOMAIN_RULES:
+        if host == rule_host and re.search(path, parsed.path):
+            return intent, confidence
+    return None
+
+
+class IntentModel:
+    """
+    Multinomial logistic regression over standardized embedding_small
+    vectors, trained with plain batch gradient descent in NumPy.
+    """
+
+    def __init__(self, classes: list[str], mean: np.ndarray, scale: np.ndarray, weights: np.ndarray, bias: np.ndarray):
+        self.classes = classes
+        self.mean = mean
+        self.scale = scale
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def fit(cls, X: np.ndarray, labels: list[str], epochs: int = 300, lr: float = 0.5, l2: float = 1e-4) -> "IntentModel":
+        classes = sorted(set(labels))
+        index = {c: i for i, c in enumerate(classes)}
+        y = np.array([index[label] for label in labels])
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0) + 1e-6
+        Z = (X - mean) / scale
+        onehot = np.eye(len(classes), dtype=np.float32)[y]
+        weights = np.zeros((X.shape[1], len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        for _ in range(epochs):
+            grad = _softmax(Z @ weights + bias) - onehot
+            weights -= lr * (Z.T @ grad / len(y) + l2 * weights)
+            bias -= lr * grad.mean(axis=0)
+        return cls(classes, mean, scale, weights, bias)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return _softmax(((X - self.mean) / self.scale) @ self.weights + self.bias)
+
+    def save(self, path: str | Path) -> None:
+        np.savez(path, classes=np.array(self.classes), mean=self.mean, scale=self.scale,
+                 weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IntentModel":
+        with np.load(path) as data:
+            return cls([str(c) for c in data["classes"]], data["mean"], data["scale"], data["weights"], data["bias"])
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(logits)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def local_result(intent: str, confidence: float, source: str) -> dict:
+    return {
+        "intent": intent,
+        "confidence": round(float(confidence), 3),
+        "suggested_action": SUGGESTED_ACTIONS[intent],
+        "source": source,
+    }
+
+
+class IntentClassifier:
+    """
+    First stage of the intent cascade: domain rules, then the trained
+    model (if INTENT_MODEL_PATH exists). Returns a result only when it is
+    at least INTENT_LOCAL_THRESHOLD confident; otherwise the caller asks
+    Gemini. The model file is read once; restart to pick up a retrained one.
+    """
+
+    def __init__(self, model_path: str, threshold: float):
+        self.model_path = model_path
+        self.threshold = threshold
+        self._model: IntentModel | None = None
+        self._loaded = False
+        self.llm_calls = 0
+        self.summary_only_calls = 0
+        self.no_calls = 0
+
+    @property
+    def model(self) -> IntentModel | None:
+        if not self._loaded:
+            self._loaded = True
+            if Path(self.model_path).exists():
+                try:
+                    self._model = IntentModel.load(self.model_path)
+                except Exception as e:
+                    print("[intent_classifier] could not load model:", e)
+        return self._model
+
+    def classify_url(self, url: str | None) -> dict | None:
+        match = rule_intent(url)
+        if match and match[1] >= self.threshold:
+            return local_result(*match, source="rules")
+        return None
+
+    def classify_embedding(self, embedding: list[float] | None) -> dict | None:
+        if self.model is None or embedding is None:
+            return None
+        proba = self.model.predict_proba(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+        best = int(proba.argmax())
+        intent = self.model.classes[best]
+        if proba[best] >= self.threshold and intent in VALID_INTENTS:
+            return local_result(intent, proba[best], source="model")
+        return None
+
+    def record(self, result: dict | None, summary_call: bool) -> None:
+        """
+        Count what the save cost. A local intent still pays a summary-only
+        Gemini call when there is text to summarize, so only saves with
+        neither skip the round trip.
+        """
+        if result is None:
+            self.llm_calls += 1
+        elif summary_call:
+            self.summary_only_calls += 1
+        else:
+            self.no_calls += 1
+
+    def stats(self) -> dict:
+        local = self.summary_only_calls + self.no_calls
+        total = local + self.llm_calls
+        return {
+            "model_loaded": self.model is not None,
+            "threshold": self.threshold,
+            "combined_llm": self.llm_calls,
+            "summary_only_llm": self.summary_only_calls,
+            "no_llm": self.no_calls,
+            "intent_local_rate": round(local / total, 4) if total else 0.0,
+            "llm_call_reduction": round(self.no_calls / total, 4) if total else 0.0,
+        }
+
+
+intent_classifier = IntentClassifier(settings.INTENT_MODEL_PATH, settings.INTENT_LOCAL_THRESHOLD)
@@ -1,10 +1,9 @@
 import json
-import asyncio
-import google.generativeai as genai
-from app.core.config import settings
+from app.services.ai_cache import ai_cache, cache_key
+from app.services.gemini_client import gemini
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel("models/gemini-2.5-flash")
+MODEL_NAME = "models/gemini-2.5-flash"
+model = gemini.model(MODEL_NAME)
 
 VALID_INTENTS = [
     "learning",
@@ -16,6 +15,25 @@ VALID_INTENTS = [
     "other"
 ]
 
+INTENT_GUIDE = """\
+Valid intents:
+- learning (courses, research, tutorials, knowledge)
+- career (jobs, internships, resumes, networking)
+- startup (business ideas, funding, entrepreneurship)
+- shopping (products, Amazon links, wishlists)
+- entertainment (memes, videos, social browsing)
+- self-improvement (fitness, mindset, productivity)
+- other (ONLY if absolutely unclear)
+
+IMPORTANT:
+- Do NOT default to "other" unless truly ambiguous.
+- If it's a product page → shopping
+- If it's research or GitHub → learning
+- If it's job/career related → career
+- If it's YouTube educational → learning
+- If it's purely fun scrolling → entertainment
+"""
+
 
 async def classify_intent(title: str, url: str, content: str) -> dict:
     combined_text = f"""
@@ -27,6 +45,11 @@ Content: {content[:2500]}
     if len(combined_text.strip()) < 20:
         return fallback()
 
+    key = cache_key("intent", MODEL_NAME, title, url, content[:2500])
+    cached = await ai_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
     prompt = f"""
 You are an AI that infers USER INTENT behind saved content.
 
@@ -34,23 +57,7 @@ Your job:
 Determine WHY the user saved this.
 Infer motivation, not just topic.
 
-Valid intents:
-- learning (courses, research, tutorials, knowledge)
-- career (jobs, internships, resumes, networking)
-- startup (business ideas, funding, entrepreneurship)
-- shopping (products, Amazon links, wishlists)
-- entertainment (memes, videos, social browsing)
-- self-improvement (fitness, mindset, productivity)
-- other (ONLY if absolutely unclear)
-
-IMPORTANT:
-- Do NOT default to "other" unless truly ambiguous.
-- If it's a product page → shopping
-- If it's research or GitHub → learning
-- If it's job/career related → career
-- If it's YouTube educational → learning
-- If it's purely fun scrolling → entertainment
-
+{INTENT_GUIDE}
 Return ONLY raw JSON:
 {{"intent": "<valid>", "confidence": <0-1>, "suggested_action": "<short next step>"}}
 
@@ -59,24 +66,17 @@ Content:
 """
 
     try:
-        response = await asyncio.to_thread(
+        response = await gemini.call(
             model.generate_content,
             prompt
         )
 
-        raw = response.text.strip()
-
-        if "```" in raw:
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-        raw = raw.strip()
-
-        result = json.loads(raw)
+        result = parse_json_response(response.text)
 
         if result.get("intent") not in VALID_INTENTS:
             result["intent"] = "other"
 
+        await ai_cache.set(key, "intent", MODEL_NAME, result)
         return result
 
     except Exception as e:
@@ -84,6 +84,15 @@ Content:
         return fallback()
 
 
+def parse_json_response(raw: str) -> dict:
+    raw = raw.strip()
+    if "```" in raw:
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+    return json.loads(raw.strip())
+
+
 def fallback():
     return {
         "intent": "other",
@@ -0,0 +1,158 @@
+"""
+Deterministic, network-free stand-in for google.generativeai, selected with
+AI_PROVIDER=offline. It implements only the part of the SDK that
+GeminiRegistry uses (configure, GenerativeModel.generate_content,
+embed_content), so services run unchanged on a single box for load tests
+and air-gapped installs.
+
+- Text prompts get an extractive summary of their Content section.
+- Prompts that ask for raw JSON get the keys their template names, filled
+  from domain and keyword rules.
+- Images get a short description of their size.
+- Embeddings are signed feature hashes of word unigrams and bigrams.
+
+OFFLINE_LLM_LATENCY_MS and OFFLINE_EMBED_LATENCY_MS add a blocking sleep
+per call to imitate provider round trips.
+"""
+import base64
+import hashlib
+import io
+import json
+import math
+import re
+import time
+from types import SimpleNamespace
+from app.core.config import settings
+from app.services.intent_classifier import SUGGESTED_ACTIONS, rule_intent
+
+KEYWORD_RULES = {
+    "career": ("job", "jobs", "hiring", "resume", "interview", "internship", "salary", "recruiter"),
+    "shopping": ("buy", "price", "deal", "discount", "cart", "wishlist", "review", "shipping"),
+    "startup": ("startup", "founder", "funding", "seed", "pitch", "saas", "investor", "mvp"),
+    "learning": ("tutorial", "course", "guide", "paper", "docs", "learn", "lecture", "research"),
+    "entertainment": ("meme", "funny", "trailer", "episode", "music", "game", "watch", "lol"),
+    "self-improvement": ("habit", "workout", "fitness", "productivity", "mindset", "sleep", "meditation"),
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def configure(api_key: str | None = None) -> None:
+    pass
+
+
+def _sleep(ms: float) -> None:
+    if ms > 0:
+        time.sleep(ms / 1000)
+
+
+def _field(prompt: str, name: str) -> str:
+    match = re.search(rf"^{name}: (.*)$", prompt, re.M)
+    return match.group(1).strip() if match else ""
+
+
+def _content(prompt: str) -> str:
+    body = prompt.rsplit("Content:", 1)[-1]
+    return body.split("\n\nSummary:", 1)[0].strip()
+
+
+def summarize(text: str, sentences: int = 2, max_chars: int = 300) -> str:
+    parts = re.split(r"(?<=[.!?])\s+", " ".join(text.split()))
+    summary = " ".join(parts[:sentences])
+    return summary[:max_chars].rstrip() or "No summary available."
+
+
+def classify(url: str, text: str) -> tuple[str, float]:
+    match = rule_intent(url)
+    if match:
+        return match
+    tokens = TOKEN_RE.findall(text.lower())
+    scores = {intent: sum(tokens.count(w) for w in words) for intent, words in KEYWORD_RULES.items()}
+    intent, hits = max(scores.items(), key=lambda item: item[1])
+    if not hits:
+        return "other", 0.5
+    return intent, min(0.6 + 0.1 * hits, 0.9)
+
+
+def _json_keys(prompt: str) -> list[str]:
+    match = re.search(r"Return ONLY raw JSON:\s*(\{[^\n]*\})", prompt)
+    return re.findall(r'"(\w+)":', match.group(1)) if match else []
+
+
+def _answer(prompt: str) -> str:
+    keys = _json_keys(prompt)
+    content = _content(prompt)
+    if not keys:
+        return summarize(content)
+
+    title, url = _field(prompt, "Title"), _field(prompt, "URL")
+    intent, confidence = classify(url, f"{title} {content}")
+    values = {
+        "summary": summarize(content),
+        "intent": intent,
+        "confidence": confidence,
+        "suggested_action": SUGGESTED_ACTIONS[intent],
+    }
+    return json.dumps({key: values.get(key) for key in keys})
+
+
+def _describe_image(part: dict) -> str:
+    from PIL import Image
+
+    data = base64.b64decode(part["data"])
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+    return f"A {width}x{height} screenshot ({len(data) // 1024} KB) saved for later."
+
+
+class GenerativeModel:
+    def __init__(self, name: str, generation_config: dict | None = None):
+        self.model_name = name
+        self.generation_config = generation_config
+
+    def generate_content(self, contents):
+        _sleep(settings.OFFLINE_LLM_LATENCY_MS)
+        if isinstance(contents, list):
+            image = next((p for p in contents if isinstance(p, dict) and "data" in p), None)
+            if image is not None:
+                return SimpleNamespace(text=_describe_image(image))
+            contents = "\n".join(p for p in contents if isinstance(p, str))
+        return SimpleNamespace(text=_answer(contents))
+
+
+def _bucket(feature: str, salt: bytes) -> tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8, key=salt).digest()
+    value = int.from_bytes(digest, "little")
+    return value >> 1, -1.0 if value & 1 else 1.0
+
+
+def hash_embedding(text: str, dim: int | None = None, head: int | None = None) -> list[float]:
+    """
+    Signed feature hashing into `dim` buckets. Each feature also lands in
+    one of the first `head` buckets, so the Matryoshka-truncated
+    embedding_small still sees every token.
+    """
+    dim = dim or settings.OFFLINE_EMBEDDING_DIM
+    head = min(head or settings.EMBEDDING_INDEX_DIM, dim)
+    tokens = TOKEN_RE.findall(text.lower())
+    counts: dict[str, int] = {}
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        counts[feature] = counts.get(feature, 0) + 1
+
+    vector = [0.0] * dim
+    for feature, count in counts.items():
+        weight = 1.0 + math.log(count)
+        index, sign = _bucket(feature, b"head")
+        vector[index % head] += sign * weight
+        index, sign = _bucket(feature, b"full")
+        vector[index % dim] += sign * weight
+
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector] if norm else vector
+
+
+def embed_content(model: str, content, task_type: str | None = None, **kwargs) -> dict:
+    _sleep(settings.OFFLINE_EMBED_LATENCY_MS)
+    if isinstance(content, list):
+        return {"embedding": [hash_embedding(text) for text in content]}
+    return {"embedding": hash_embedding(content)}
@@ -0,0 +1,56 @@
+from sqlalchemy import select, func, cast, BigInteger
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from app.core.config import settings
+from app.models.save import Save
+from app.services.screenshot_service import PLACEHOLDER_URL, PreparedScreenshot
+
+REUSED_FIELDS = (
+    "screenshot_text", "summary", "intent", "intent_confidence", "intent_source",
+    "suggested_action", "embedding", "embedding_small",
+)
+MAX_CANDIDATES = 20
+
+
+def confirms(candidate_url: str, candidate_digest: bytes | None, screenshot: PreparedScreenshot, url: str) -> bool:
+    """
+    A close dHash alone is not enough: text pages with the same layout land
+    a few bits apart whatever they say. Reuse only identical pixels, or a
+    near match of the same page URL.
+    """
+    if candidate_digest is not None and candidate_digest == screenshot.digest:
+        return True
+    return url != PLACEHOLDER_URL and candidate_url == url
+
+
+async def find_duplicate(db: AsyncSession, user_id: int, screenshot: PreparedScreenshot, url: str) -> Save | None:
+    """
+    The user's closest enriched screenshot whose perceptual hash is within
+    SCREENSHOT_DEDUP_DISTANCE bits of this one and that confirms() accepts,
+    or None.
+    """
+    if settings.SCREENSHOT_DEDUP_DISTANCE < 0:
+        return None
+    distance = func.bit_count(cast(Save.screenshot_hash.op("#")(cast(screenshot.phash, BigInteger)), BIT(64)))
+    candidates = await db.execute(
+        select(Save.id, Save.url, Save.screenshot_digest)
+        .where(
+            Save.user_id == user_id,
+            Save.screenshot_hash.is_not(None),
+            Save.enrichment_status == "done",
+            distance <= settings.SCREENSHOT_DEDUP_DISTANCE,
+        )
+        .order_by(distance, Save.created_at.desc())
+        .limit(MAX_CANDIDATES)
+    )
+    match = next((row.id for row in candidates if confirms(row.url, row.screenshot_digest, screenshot, url)), None)
+    if match is None:
+        return None
+    return await db.get(Save, match, options=[undefer(Save.embedding), undefer(Save.embedding_small)])
+
+
+def copy_enrichment(source: Save, target: Save) -> None:
+    for field in REUSED_FIELDS:
+        setattr(target, field, getattr(source, field))
+    target.enrichment_status = "done"
@@ -1,18 +1,96 @@
 import asyncio
 import base64
-import google.generativeai as genai
+import hashlib
+import io
+from typing import BinaryIO, NamedTuple
+from PIL import Image, ImageOps
 from app.core.config import settings
+from app.services.gemini_client import gemini
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+VISION_MODEL = "gemini-1.5-flash"
+vision_model = gemini.model(VISION_MODEL)
 
+ALLOWED_FORMATS = {"PNG", "JPEG", "WEBP", "GIF", "BMP", "TIFF"}
+MAX_PIXELS = 50_000_000
+# url given to screenshots saved without a page, never used to confirm a duplicate
+PLACEHOLDER_URL = "screenshot://local"
 
-async def extract_text_from_screenshot(image_bytes: bytes) -> str:
-    """Uses Gemini Vision to read and understand a screenshot."""
+
+class ScreenshotRejected(ValueError):
+    """Upload is not an image we accept."""
+
+
+class ScreenshotTooLarge(ScreenshotRejected):
+    """Upload is over SCREENSHOT_MAX_UPLOAD_BYTES."""
+
+
+class PreparedScreenshot(NamedTuple):
+    data: bytes
+    mime_type: str
+    phash: int
+    digest: bytes
+
+
+def dhash(img: Image.Image) -> int:
+    """
+    64-bit difference hash: each bit says whether a pixel of the 9x8
+    grayscale thumbnail is brighter than its right neighbour. Returned as
+    a signed int so it fits a Postgres BIGINT.
+    """
+    pixels = list(img.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def prepare_screenshot(fileobj: BinaryIO, max_side: int | None = None, quality: int | None = None) -> PreparedScreenshot:
+    """
+    Detect the real format, downscale to `max_side`, re-encode as JPEG and
+    compute the perceptual hash and a digest of the downscaled pixels. Reads from the (disk-spooled) upload and is
+    CPU bound, run it in a thread.
+    """
+    max_side = max_side or settings.SCREENSHOT_MAX_SIDE
+    quality = quality or settings.SCREENSHOT_JPEG_QUALITY
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
+        img = Image.open(fileobj)
+        if img.format not in ALLOWED_FORMATS:
+            raise ScreenshotRejected(f"unsupported image format {img.format}")
+        if img.width * img.height > MAX_PIXELS:
+            raise ScreenshotRejected("image dimensions too large")
+
+        img.draft("RGB", (max_side, max_side))  # JPEG decodes straight to a smaller scale
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=quality, optimize=True)
+        return PreparedScreenshot(out.getvalue(), "image/jpeg", dhash(img), hashlib.sha256(img.tobytes()).digest())
+    except ScreenshotRejected:
+        raise
+    except Exception as e:
+        raise ScreenshotRejected(f"could not read image: {e}")
+
 
+async def preprocess_upload(fileobj: BinaryIO, size: int | None) -> PreparedScreenshot:
+    if size is not None and size > settings.SCREENSHOT_MAX_UPLOAD_BYTES:
+        raise ScreenshotTooLarge(f"screenshot is over {settings.SCREENSHOT_MAX_UPLOAD_BYTES} bytes")
+    return await asyncio.to_thread(prepare_screenshot, fileobj)
+
+
+async def extract_text_from_screenshot(image_bytes: bytes, mime_type: str = "image/png") -> str:
+    """Uses Gemini Vision to read and understand a screenshot."""
+    try:
         image_part = {
-            "mime_type": "image/png",
+            "mime_type": mime_type,
             "data": base64.b64encode(image_bytes).decode("utf-8")
         }
 
@@ -24,11 +102,11 @@ Extract and describe:
 
 Be concise, 3-4 sentences max."""
 
-        response = await asyncio.to_thread(
-            model.generate_content,
+        response = await gemini.call(
+            vision_model.generate_content,
             [prompt, image_part]
         )
         return response.text.strip()
     except Exception as e:
         print(f"[screenshot_service] Error: {e}")
-        return None
\ No newline at end of file
+        return None
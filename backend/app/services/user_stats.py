@@ -0,0 +1,131 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.save import Save
+from app.models.user_stats import UserStats
+
+UNCLASSIFIED = "unclassified"
+
+
+def intent_key(intent: str | None) -> str:
+    return intent or UNCLASSIFIED
+
+
+async def bump_stats(
+    db: AsyncSession,
+    user_id: int,
+    total: int = 0,
+    acted: int = 0,
+    intents: dict[str, int] | None = None,
+) -> int:
+    """
+    Atomically add deltas to a user's counters and bump their data version
+    inside the caller's transaction. A missing row is first built from
+    saves (users who predate user_stats), with autoflush off so the
+    caller's unflushed change isn't counted twice.
+    Call with no deltas to record a write that doesn't move any counter.
+    Returns the new version, which the caller stamps on the changed save.
+    """
+    with db.no_autoflush:
+        exists = await db.scalar(select(UserStats.user_id).where(UserStats.user_id == user_id))
+        if exists is None:
+            await reconcile(db, user_id)
+
+    intents = {k: v for k, v in (intents or {}).items() if v}
+    params = {"user_id": user_id, "total": total, "acted": acted}
+    merged = "user_stats.intent_counts"
+    initial = "'{}'::jsonb"
+    for i, (intent, delta) in enumerate(intents.items()):
+        params[f"intent_{i}"] = intent
+        params[f"delta_{i}"] = delta
+        merged += (
+            f" || jsonb_build_object(CAST(:intent_{i} AS text), "
+            f"COALESCE((user_stats.intent_counts ->> CAST(:intent_{i} AS text))::int, 0) + :delta_{i})"
+        )
+        initial += f" || jsonb_build_object(CAST(:intent_{i} AS text), GREATEST(:delta_{i}, 0))"
+
+    result = await db.execute(
+        text(f"""
+            INSERT INTO user_stats (user_id, total, acted, intent_counts, version, updated_at)
+            VALUES (:user_id, GREATEST(:total, 0), GREATEST(:acted, 0), {initial}, 1, now())
+            ON CONFLICT (user_id) DO UPDATE SET
+                version = user_stats.version + 1,
+                total = user_stats.total + :total,
+                acted = user_stats.acted + :acted,
+                intent_counts = {merged},
+                updated_at = now()
+            RETURNING version
+        """),
+        params
+    )
+    return result.scalar_one()
+
+
+async def record_created(db: AsyncSession, save: Save) -> int:
+    return await bump_stats(db, save.user_id, total=1, acted=int(bool(save.action_taken)),
+                            intents={intent_key(save.intent): 1})
+
+
+async def record_deleted(db: AsyncSession, save: Save) -> int:
+    return await bump_stats(db, save.user_id, total=-1, acted=-int(bool(save.action_taken)),
+                            intents={intent_key(save.intent): -1})
+
+
+async def record_updated(db: AsyncSession, user_id: int, action_before: bool, action_after: bool) -> int:
+    return await bump_stats(db, user_id, acted=int(bool(action_after)) - int(bool(action_before)))
+
+
+async def record_enriched(db: AsyncSession, user_id: int, intent_before: str | None, intent_after: str | None) -> int:
+    intents = {}
+    if intent_key(intent_before) != intent_key(intent_after):
+        intents = {intent_key(intent_before): -1, intent_key(intent_after): 1}
+    return await bump_stats(db, user_id, intents=intents)
+
+
+async def get_stats(db: AsyncSession, user_id: int) -> UserStats:
+    """Counters for one user, built from saves the first time they're asked for."""
+    stats = await db.get(UserStats, user_id)
+    if stats is None:
+        await reconcile(db, user_id)
+        stats = await db.get(UserStats, user_id)
+    return stats
+
+
+async def reconcile(db: AsyncSession, user_id: int | None = None) -> int:
+    """
+    Recompute counters from saves (one user, or everyone) and overwrite
+    rows that drifted. Returns how many rows were inserted or repaired.
+    """
+    scope = "WHERE u.id = :user_id" if user_id is not None else ""
+    result = await db.execute(
+        text(f"""
+            WITH per_intent AS (
+                SELECT user_id, COALESCE(intent, '{UNCLASSIFIED}') AS intent,
+                       count(*) AS n, count(*) FILTER (WHERE action_taken) AS acted
+                FROM saves
+                {"WHERE user_id = :user_id" if user_id is not None else ""}
+                GROUP BY 1, 2
+            ),
+            per_user AS (
+                SELECT user_id, sum(n)::int AS total, sum(acted)::int AS acted,
+                       jsonb_object_agg(intent, n) AS intent_counts
+                FROM per_intent
+                GROUP BY user_id
+            )
+            INSERT INTO user_stats (user_id, total, acted, intent_counts, version, updated_at)
+            SELECT u.id, COALESCE(p.total, 0), COALESCE(p.acted, 0),
+                   COALESCE(p.intent_counts, '{{}}'::jsonb), 1, now()
+            FROM users u LEFT JOIN per_user p ON p.user_id = u.id
+            {scope}
+            ON CONFLICT (user_id) DO UPDATE SET
+                total = EXCLUDED.total,
+                acted = EXCLUDED.acted,
+                intent_counts = EXCLUDED.intent_counts,
+                version = user_stats.version + 1,
+                updated_at = now()
+            WHERE user_stats.total IS DISTINCT FROM EXCLUDED.total
+               OR user_stats.acted IS DISTINCT FROM EXCLUDED.acted
+               OR user_stats.intent_counts IS DISTINCT FROM EXCLUDED.intent_counts
+        """),
+        {"user_id": user_id} if user_id is not None else {}
+    )
+    return result.rowcount
@@ -0,0 +1,75 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.save import EMBEDDING_BITS_SQL
+from app.services.embedding_service import shrink_embedding
+
+
+def to_pgvector(embedding: list[float]) -> str:
+    return "[" + ",".join(str(x) for x in embedding) + "]"
+
+
+async def configure_hnsw_scan(db: AsyncSession, wanted: int, order: str) -> None:
+    """
+    Size the HNSW scan for this transaction so the per-user WHERE, applied
+    after the index scan, still leaves `wanted` rows. `order` is the
+    iterative_scan mode: strict_order, or relaxed_order when the caller
+    re-sorts the rows itself.
+    """
+    ef_search = min(max(settings.HNSW_EF_SEARCH, wanted), 1000)  # pgvector's ef_search ceiling
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+    if settings.HNSW_ITERATIVE_SCAN:
+        await db.execute(text(f"SET LOCAL hnsw.iterative_scan = {order}"))
+
+
+async def vector_search(
+    db: AsyncSession,
+    user_id: int,
+    query_embedding: list[float],
+    limit: int = 10,
+    quantized: bool | None = None,
+    candidates: int | None = None,
+    columns: str = "id",
+):
+    """
+    Nearest saves for one user, as row mappings holding only `columns`.
+
+    Exact mode orders by cosine distance on SEARCH_EMBEDDING_COLUMN.
+    Quantized mode first takes `candidates` rows by Hamming distance on the
+    binary-quantized embedding (ix_saves_quantized_hnsw), then reranks only
+    those with exact cosine distance on the full embedding.
+    """
+    quantized = settings.SEARCH_QUANTIZED if quantized is None else quantized
+    params = {"user_id": user_id, "limit": limit, "embedding": to_pgvector(query_embedding)}
+
+    if quantized:
+        params["candidates"] = max(limit, candidates or settings.SEARCH_RERANK_CANDIDATES)
+        # Candidates are reranked by exact distance, so their order can be relaxed
+        await configure_hnsw_scan(db, params["candidates"], "relaxed_order")
+        sql = f"""
+            SELECT {columns} FROM saves
+            WHERE id IN (
+                SELECT id FROM saves
+                WHERE user_id = :user_id AND embedding IS NOT NULL
+                ORDER BY {EMBEDDING_BITS_SQL} <~> binary_quantize(CAST(:embedding AS vector))
+                LIMIT :candidates
+            )
+            ORDER BY embedding <=> CAST(:embedding AS vector)
+            LIMIT :limit
+        """
+    else:
+        column = settings.SEARCH_EMBEDDING_COLUMN
+        if column == "embedding_small":
+            params["embedding"] = to_pgvector(shrink_embedding(query_embedding))
+            await configure_hnsw_scan(db, limit, "strict_order")
+        else:
+            column = "embedding"
+        sql = f"""
+            SELECT {columns} FROM saves
+            WHERE user_id = :user_id
+            ORDER BY {column} <=> CAST(:embedding AS vector)
+            LIMIT :limit
+        """
+
+    result = await db.execute(text(sql), params)
+    return result.mappings().all()
@@ -0,0 +1,34 @@
+"""
+Enrichment worker. Runs separately from the API so both can scale on their own:
+
+    python -m app.worker
+"""
+import asyncio
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import user  # noqa: F401  (registers User for Save.user)
+from app.services.enrichment_queue import claim_jobs, process_job
+from app.services.gemini_client import gemini
+
+
+async def run_worker():
+    if settings.GEMINI_WARMUP:
+        await gemini.warm_up()
+    print(f"✅ {settings.APP_NAME} enrichment worker started — batch {settings.ENRICHMENT_BATCH_SIZE}")
+    while True:
+        async with AsyncSessionLocal() as db:
+            job_ids = await claim_jobs(db, settings.ENRICHMENT_BATCH_SIZE)
+
+        if not job_ids:
+            await asyncio.sleep(settings.ENRICHMENT_POLL_SECONDS)
+            continue
+
+        results = await asyncio.gather(*(process_job(job_id) for job_id in job_ids), return_exceptions=True)
+        for job_id, result in zip(job_ids, results):
+            if isinstance(result, Exception):
+                # The job keeps its lease and is reclaimed once it expires
+                print(f"[worker] job {job_id} crashed: {result!r}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from app.core import auth
+from app.core.auth import (
+    PrincipalCache, create_access_token, create_stream_token, get_stream_user, revoke_tokens, user_from_token
+)
+from app.core.config import settings
+
+
+class FakeSession:
+    """Just enough AsyncSession for user_from_token and revoke_tokens."""
+
+    def __init__(self, user):
+        self.user = user
+
+    async def execute(self, statement):
+        if statement.is_dml:
+            self.user.tokens_valid_after = datetime.utcnow()
+        return SimpleNamespace(scalar_one_or_none=lambda: self.user)
+
+
+def make_user(user_id=1):
+    return SimpleNamespace(id=user_id, email="a@example.com", name="A",
+                           created_at=datetime(2024, 1, 1), tokens_valid_after=None)
+
+
+def old_token(user_id, age_seconds):
+    return jwt.encode({"sub": str(user_id), "iat": int(time.time()) - age_seconds, "email": "a@example.com",
+                       "name": "A", "created_at": "2024-01-01T00:00:00"},
+                      settings.SECRET_KEY, algorithm="HS256")
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(auth, "principal_cache", PrincipalCache(max_entries=10, ttl_seconds=60, claims_max_age=300))
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    # iat must not depend on the host's time zone
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_iat_is_utc_on_any_host(local_timezone):
+    payload = jwt.decode(create_access_token(1), settings.SECRET_KEY, algorithms=["HS256"])
+    assert abs(payload["iat"] - time.time()) < 5
+    assert auth.principal_cache.trusts(1, payload["iat"])
+
+
+@pytest.mark.parametrize("trust_claims", [False, True])
+def test_revoking_rejects_older_tokens(monkeypatch, local_timezone, trust_claims):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", trust_claims)
+    db = FakeSession(make_user())
+    token = old_token(1, age_seconds=30)
+    assert asyncio.run(user_from_token(token, db)).id == 1
+
+    asyncio.run(revoke_tokens(db, 1))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(user_from_token(token, db))
+    assert exc.value.status_code == 401
+    assert asyncio.run(user_from_token(create_access_token(1), db)).id == 1
+
+
+def test_claims_are_not_trusted_past_max_age():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60, claims_max_age=300)
+    assert cache.trusts(1, int(time.time()) - 10)
+    assert not cache.trusts(1, int(time.time()) - 301)
+    assert not cache.trusts(1, None)
+
+
+def test_revocation_markers_are_bounded():
+    cache = PrincipalCache(max_entries=3, ttl_seconds=60, claims_max_age=300)
+    for user_id in range(10):
+        cache.invalidate(user_id)
+    assert list(cache._revoked_before) == [7, 8, 9]
+
+
+def test_stream_query_token_must_be_a_stream_token():
+    db = FakeSession(make_user())
+    assert asyncio.run(get_stream_user(token=create_stream_token(1), credentials=None, db=db)).id == 1
+    with pytest.raises(HTTPException):
+        asyncio.run(get_stream_user(token=create_access_token(1), credentials=None, db=db))
+
+
+def test_stream_token_is_short_lived_and_not_an_access_token():
+    payload = jwt.decode(create_stream_token(1), settings.SECRET_KEY, algorithms=["HS256"])
+    assert payload["exp"] - payload["iat"] <= settings.STREAM_TOKEN_EXPIRE_SECONDS
+    with pytest.raises(HTTPException):
+        asyncio.run(user_from_token(create_stream_token(1), FakeSession(make_user())))
@@ -0,0 +1,25 @@
+from starlette.requests import Request
+from app.api import caching
+from app.api.caching import make_etag
+
+
+def make_request(path="/saves/forgotten", query=b"limit=50"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []})
+
+
+def test_clock_etag_changes_each_window(monkeypatch):
+    now = [300.0 * 3333]
+    monkeypatch.setattr(caching.time, "time", lambda: now[0])
+    monkeypatch.setattr(caching.settings, "CLOCK_ETAG_SECONDS", 300)
+    request = make_request()
+    first = make_etag(7, request, 1, clock=True)
+    now[0] += 299
+    assert make_etag(7, request, 1, clock=True) == first
+    now[0] += 1
+    assert make_etag(7, request, 1, clock=True) != first
+    assert make_etag(7, request, 1) == make_etag(7, request, 1)
+
+
+def test_etag_is_per_user():
+    request = make_request()
+    assert make_etag(7, request, 1) != make_etag(7, request, 2)
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.core.config import settings
+from app.services.gemini_client import CircuitBreaker, GeminiRegistry, ProviderUnavailable
+
+
+# ── CircuitBreaker ────────────────────────────────────────────
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()          # the probe
+    assert not breaker.allow()      # everyone else waits for it
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_released_probe_lets_next_caller_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+# ── GeminiRegistry.call ───────────────────────────────────────
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(settings, "AI_MAX_WORKERS", 2)
+    monkeypatch.setattr(settings, "AI_MAX_PENDING", 1)
+    monkeypatch.setattr(settings, "AI_MAX_RETRIES", 0)
+    monkeypatch.setattr(settings, "AI_CALL_TIMEOUT_SECONDS", 0.05)
+    registry = GeminiRegistry(api_key="test")
+    registry.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    return registry
+
+
+def test_saturated_probe_does_not_wedge_breaker(registry):
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await registry.call(release.wait)          # hangs, opens the breaker
+        assert registry.breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        with pytest.raises(ProviderUnavailable, match="saturated"):
+            await registry.call(lambda: "ok")          # hung thread still holds the slot
+
+        release.set()
+        while registry._pending:
+            await asyncio.sleep(0.01)
+        assert await registry.call(lambda: "ok") == "ok"
+        assert registry.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_probe_does_not_wedge_breaker(registry):
+    async def scenario():
+        registry.breaker.record_failure()
+        await asyncio.sleep(0.06)
+
+        probe = asyncio.ensure_future(registry.call(time.sleep, 0.02, timeout=1))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        while registry._pending:
+            await asyncio.sleep(0.01)
+        assert await registry.call(lambda: "ok") == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_retries_transient_errors(registry, monkeypatch):
+    monkeypatch.setattr(settings, "AI_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "AI_RETRY_BASE_SECONDS", 0.001)
+    registry.breaker = CircuitBreaker(failure_threshold=5, reset_seconds=1)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("boom")
+        return "ok"
+
+    assert asyncio.run(registry.call(flaky)) == "ok"
+    assert len(attempts) == 3
+    assert registry.breaker.state == "closed"
+
+
+def test_client_errors_do_not_open_the_breaker(registry):
+    class InvalidArgument(Exception):
+        code = 400
+
+    def bad_request():
+        raise InvalidArgument("bad image")
+
+    registry.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=1)
+
+    async def scenario():
+        for _ in range(5):
+            with pytest.raises(InvalidArgument):
+                await registry.call(bad_request)
+        assert registry.breaker.state == "closed"
+        assert registry.breaker.failures == 0
+
+    asyncio.run(scenario())
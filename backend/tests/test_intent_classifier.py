@@ -0,0 +1,30 @@
+import pytest
+from app.services.intent_classifier import rule_intent
+
+
+@pytest.mark.parametrize("url, intent", [
+    ("https://www.amazon.com/dp/B0C1234567", "shopping"),
+    ("https://www.amazon.in/Some-Kettle/dp/B0C1234567?ref=x", "shopping"),
+    ("https://amazon.co.uk/gp/product/B0C1234567", "shopping"),
+    ("https://www.linkedin.com/jobs/view/123", "career"),
+    ("https://jobs.lever.co/acme/123", "career"),
+    ("https://m.ebay.com/itm/123", "shopping"),
+    ("https://github.com/python/cpython", "learning"),
+])
+def test_rules_match_product_and_listing_pages(url, intent):
+    assert rule_intent(url)[0] == intent
+
+
+@pytest.mark.parametrize("url", [
+    "https://aws.amazon.com/docs/lambda",
+    "https://docs.aws.amazon.com/lambda/latest/dg/welcome.html",
+    "https://music.amazon.com/albums/B0C1234567",
+    "https://www.amazon.com/gp/help/customer/display.html",
+    "https://www.linkedin.com/in/someone",
+    "https://jobs.netflix.com/jobs/123",
+    "https://lever.co/pricing",
+    "https://help.etsy.com/hc/en-us",
+    None,
+])
+def test_rules_leave_other_pages_to_the_model(url):
+    assert rule_intent(url) is None
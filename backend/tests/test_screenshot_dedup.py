@@ -0,0 +1,47 @@
+import io
+import random
+from PIL import Image, ImageDraw
+from app.core.config import settings
+from app.services.screenshot_dedup import confirms
+from app.services.screenshot_service import PLACEHOLDER_URL, prepare_screenshot
+
+WORDS = ("the page shows a list of notes about python postgres pricing jobs habits vector search "
+         "and a few links to related articles from the same site").split()
+
+
+def article(seed: int, fmt: str = "PNG") -> io.BytesIO:
+    """A text-heavy page: same header, sidebar and line layout, different words per seed."""
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (1280, 900), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 1280, 70), fill=(30, 60, 120))
+    draw.rectangle((980, 100, 1240, 860), fill=(240, 240, 240))
+    for y in range(110, 860, 18):
+        line = ""
+        while len(line) < 140:
+            line += rnd.choice(WORDS) + " "
+        draw.text((60, y), line, fill=(40, 40, 40))
+    out = io.BytesIO()
+    img.save(out, format=fmt)
+    out.seek(0)
+    return out
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << 64) - 1)).count("1")
+
+
+def test_same_layout_pages_are_not_reused():
+    first, second = prepare_screenshot(article(1)), prepare_screenshot(article(2))
+    # Layout dominates the dHash, so the database would offer this pair as a candidate
+    assert hamming(first.phash, second.phash) <= settings.SCREENSHOT_DEDUP_DISTANCE
+    assert not confirms(PLACEHOLDER_URL, first.digest, second, PLACEHOLDER_URL)
+    assert not confirms("https://blog.example/a", first.digest, second, "https://blog.example/b")
+
+
+def test_identical_pixels_or_same_page_are_reused():
+    first = prepare_screenshot(article(1))
+    again = prepare_screenshot(article(1, fmt="BMP"))
+    assert again.digest == first.digest
+    assert confirms(PLACEHOLDER_URL, first.digest, again, PLACEHOLDER_URL)
+    assert confirms("https://blog.example/a", None, prepare_screenshot(article(2)), "https://blog.example/a")
@@ -0,0 +1,19 @@
+import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from app.models import user  # noqa: F401  (registers User for Save.user)
+from app.models.save import SEARCH_TSV_SQL, Save
+from app.services import hybrid_search
+
+
+def test_fulltext_index_matches_the_lexical_query():
+    # Postgres only uses an expression index for the identical expression
+    index = next(ix for ix in Save.__table__.indexes if ix.name == "ix_saves_fulltext")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert f"USING gin ({SEARCH_TSV_SQL})" in ddl
+    assert "{SEARCH_TSV_SQL} @@" in inspect.getsource(hybrid_search.lexical_search)
+
+
+def test_saves_have_no_stored_search_columns():
+    assert "search_tsv" not in Save.__table__.c
+    assert "embedding_bits" not in Save.__table__.c